@@ -0,0 +1,223 @@
+# MIT License
+# Copyright \(c\) 2023-2024 ZHAW (Institute of Embedded Systems at Zurich University of Applied Sciences) & Securecell AG
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# https://mit-license.org/
+
+"""Benchmark suite for the export, recipe and controller paths of lucullus_rest.
+
+All benchmarks run against the FakeLucullusServer at several scales
+of ports x points x processes (x recipes x steps) and report wall time, peak memory
+(of Python allocations) and the number of requests per benchmark.
+The server runs in the same Python process, so wall time and peak
+memory include generating the responses.
+
+Run with lucullus_rest installed (e.g. ``pip install -e .``)::
+
+    python benchmarks/run_benchmarks.py --scales small medium --repeat 3
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+import tracemalloc
+import pandas as pd
+from lucullus_rest import core
+from lucullus_rest.testing import FakeLucullusServer
+
+AUTH = ("user", "password")
+
+SCALES = {
+    "small": {"n_ports": 5, "n_points": 1000, "n_processes": 2, "n_recipes": 2, "n_steps": 10},
+    "medium": {"n_ports": 20, "n_points": 10000, "n_processes": 5, "n_recipes": 20, "n_steps": 100},
+    "large": {"n_ports": 50, "n_points": 50000, "n_processes": 10, "n_recipes": 200, "n_steps": 500},
+}
+
+BENCHMARKS = {}
+
+def benchmark(fun):
+    """Register a benchmark. A benchmark takes the running server and
+    returns the function to time."""
+
+    BENCHMARKS[fun.__name__] = fun
+    return fun
+
+def port_names(server):
+    """Get names of all process value ports of the server."""
+
+    return [port["name"] for port in server.ports if port["name"].startswith("PV_")]
+
+@benchmark
+def import_lucullus_rest(server):
+    # Fresh interpreter, as the package is already imported here. Fails
+    # if importing and using the lightweight REST functions loads pandas.
+    code = (
+        "import sys, lucullus_rest; lucullus_rest.get_running_processes; "
+        "lucullus_rest.set_current_values; assert 'pandas' not in sys.modules"
+    )
+    return lambda: subprocess.run([sys.executable, "-c", code], check=True)
+
+@benchmark
+def get_process_signal_info(server):
+    return lambda: core.get_process_signal_info("Process_000", AUTH)
+
+@benchmark
+def export_to_df(server):
+    ports = port_names(server)
+    return lambda: core.export_to_df("Process_000", ports, AUTH)
+
+@benchmark
+def export_to_df_compact(server):
+    ports = port_names(server)
+    return lambda: core.export_to_df("Process_000", ports, AUTH, compact_dtypes=True)
+
+@benchmark
+def export_to_df_client_resampling(server):
+    ports = port_names(server)
+    return lambda: core.export_to_df(
+        "Process_000", ports, AUTH, interval=600, resampling="client"
+    )
+
+@benchmark
+def get_df_from_json(server):
+    # The payload is generated up front, so only the parsing is timed.
+    process = server.processes[0]
+    json_data = [
+        server.handle("GET", "signals", {
+            "processId": [str(process["id"])], "portId": [str(port["id"])]
+        })[1]
+        for port in server.ports if port["name"].startswith("PV_")
+    ]
+    return lambda: core.get_df_from_json(json_data)
+
+@benchmark
+def parse_recipe_table(server):
+    # The payload is generated up front, so only the parsing is timed.
+    json_data = server.handle("GET", "recipes/Recipe_000", {})[1]
+    return lambda: core.parse_recipe_table(json_data)
+
+@benchmark
+def get_recipe_tables(server):
+    recipes = [f"Recipe_{i:03d}" for i in range(server.n_recipes)]
+    return lambda: core.get_recipe_tables(recipes, AUTH)
+
+@benchmark
+def get_media_tables(server):
+    processes = [process["name"] for process in server.processes]
+    return lambda: core.get_media_tables(processes, AUTH)
+
+@benchmark
+def controller_update(server):
+    def calc_fun(collected_data, calculated_data, attributes):
+        return collected_data.rolling(10).mean()
+
+    def output_fun(collected_data, calculated_data, attributes):
+        return {"PV_000": float(calculated_data.iloc[-1, 0])}
+
+    controller = core.Controller(
+        "Process_000", port_names(server), AUTH,
+        calc_fun=calc_fun, output_fun=output_fun, print_progress=False,
+        historic_processes=[process["name"] for process in server.processes[1:]]
+    )
+    return controller.update
+
+def measure(fun, server, repeat=1):
+    """Measure wall time, peak memory and requests of a function.
+
+    Parameters
+    ----------
+    fun : function
+        Function without arguments to measure.
+    server : FakeLucullusServer
+        Running server the function requests.
+    repeat : int, default=1
+        Number of repetitions, the fastest one is reported.
+
+    Returns
+    -------
+    result : dict
+        Wall time in s, peak memory in MB and number of requests of
+        a single call.
+    """
+    wall_times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        fun()
+        wall_times.append(time.perf_counter() - start_time)
+
+    server.reset_counts()
+    tracemalloc.start()
+    fun()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "wall_time [s]": min(wall_times),
+        "peak_memory [MB]": peak_memory / 1e6,
+        "requests": sum(server.request_counts.values()),
+    }
+
+def run(scales, names=None, repeat=1, latency=0):
+    """Run benchmarks at several scales.
+
+    Parameters
+    ----------
+    scales : list of str
+        Keys of SCALES to run.
+    names : list of str, default=None
+        Names of benchmarks to run. If None, runs all benchmarks.
+    repeat : int, default=1
+        Number of repetitions per benchmark.
+    latency : float, default=0
+        Latency in seconds of the server per request.
+
+    Returns
+    -------
+    results : pandas DataFrame
+        Results with benchmark and scale as index.
+    """
+    names = names if names else list(BENCHMARKS)
+    results = {}
+    for scale in scales:
+        with FakeLucullusServer(**SCALES[scale], latency=latency) as server:
+            for name in names:
+                fun = BENCHMARKS[name](server)
+                results.update({(name, scale): measure(fun, server, repeat=repeat)})
+    results = pd.DataFrame(results).T.astype({"requests": int})
+    results.index.names = ["benchmark", "scale"]
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--scales", nargs="+", default=["small"], choices=list(SCALES))
+    parser.add_argument("--benchmarks", nargs="+", default=None, choices=list(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--save-path", default=None, help="Save results as csv.")
+    args = parser.parse_args()
+
+    results = run(args.scales, args.benchmarks, repeat=args.repeat, latency=args.latency)
+    print(results.to_string())
+    if args.save_path:
+        results.to_csv(args.save_path)
+
+if __name__ == "__main__":
+    main()
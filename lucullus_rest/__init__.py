@@ -44,5 +44,36 @@ __version__ = "0.0.1"
 __author__ = ["Stefan F. Hauer"]
 __license__ = "MIT"
 
+import importlib
+
+# core only imports numpy and pandas when they are first needed, the
+# other modules are only imported when one of their attributes is
+# accessed (see __getattr__).
 from .core import *
-from . import utils
+from .client import Client, ResponseCache, configure
+
+_LAZY_ATTRIBUTES = {
+    "buffer": None,
+    "catalog": None,
+    "client": None,
+    "utils": None,
+    "subscription": None,
+    "profiling": None,
+    "shared": None,
+    "testing": None,
+    "Catalog": "catalog",
+    "Profile": "profiling",
+    "Subscription": "subscription",
+    "subscribe": "subscription",
+}
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name = _LAZY_ATTRIBUTES[name]
+    if module_name is None:
+        return importlib.import_module(f".{name}", __name__)
+    return getattr(importlib.import_module(f".{module_name}", __name__), name)
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
@@ -0,0 +1,242 @@
+# MIT License
+# Copyright \(c\) 2023-2024 ZHAW (Institute of Embedded Systems at Zurich University of Applied Sciences) & Securecell AG
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# https://mit-license.org/
+
+"""Bounded buffer for data that is collected over a long time."""
+
+from lucullus_rest.utils import LazyModule
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+class RingBuffer:
+    """Buffer of time indexed data, backed by preallocated NumPy
+    arrays per column, that keeps at most max_rows rows and rows not
+    older than max_age.
+
+    Once the buffer is full, new rows overwrite the oldest ones, so
+    memory and the cost of appending stay bounded. Numeric columns
+    are stored as float64, all other columns as objects. Columns are
+    stored by position, so port names of several devices may repeat.
+
+    Attributes
+    ----------
+    max_rows : int, default=None
+        Maximum number of rows. If None, the number of rows is only
+        bounded by max_age.
+    max_age : float, default=None
+        Maximum age in seconds of rows relative to the newest row. If
+        None, rows are only bounded by max_rows.
+    columns : list
+        Column names.
+    watermark : pandas Timedelta or None
+        Time of the newest row.
+
+    Examples
+    --------
+    >>> buffer = RingBuffer(max_rows=10000)
+    >>> buffer.append(export_to_df(process, ["PV_pO2"], auth))
+    >>> collected_data = buffer.to_frame()
+    """
+
+    def __init__(self, max_rows=None, max_age=None, initial_capacity=1024):
+        """Initialize the RingBuffer class."""
+
+        if max_rows is None and max_age is None:
+            raise ValueError("Either max_rows or max_age has to be set.")
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self.columns = []
+        self.index_name = None
+
+        self._capacity = max_rows if max_rows else initial_capacity
+        self._time = np.zeros(self._capacity, dtype=np.int64)
+        self._values = []
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def watermark(self):
+        """Time of the newest row, None if the buffer is empty."""
+
+        if self._size == 0:
+            return None
+        return pd.Timedelta(int(self._time[(self._start + self._size - 1) % self._capacity]))
+
+    def append(self, data):
+        """Append data and merge it into the rows of the buffer in the
+        time range data covers.
+
+        Values of data take precedence over buffered values at the
+        same time, missing values of data keep the buffered ones.
+        Values that are logged late, e.g. offline samples entered
+        after the fact, are inserted in order of time. Rows older
+        than the first row of data are kept as they are.
+
+        Parameters
+        ----------
+        data : pandas DataFrame
+            Data with a timedelta index sorted in ascending order.
+        """
+        if self.index_name is None:
+            self.index_name = data.index.name
+        column_positions = self._get_column_positions(data.columns)
+        for data_position, position in enumerate(column_positions):
+            self._update_dtype(position, data.iloc[:, data_position])
+        if len(data) == 0:
+            return
+        time_ns = data.index.values.astype("timedelta64[ns]").astype(np.int64)
+
+        # Buffered rows from the first time of data on are merged with data
+        buffered_positions = self._ordered_positions()
+        n_kept = int(np.searchsorted(self._time[buffered_positions], time_ns[0], side="left"))
+        overlap_positions = buffered_positions[n_kept:]
+        overlap_time_ns = self._time[overlap_positions]
+        if len(overlap_positions):
+            merged_time_ns = np.union1d(overlap_time_ns, time_ns)
+        else:
+            merged_time_ns = time_ns
+        overlap_rows = np.searchsorted(merged_time_ns, overlap_time_ns)
+        data_rows = np.searchsorted(merged_time_ns, time_ns)
+
+        merged_values = []
+        for values in self._values:
+            merged = np.full(len(merged_time_ns), np.nan, dtype=values.dtype)
+            merged[overlap_rows] = values[overlap_positions]
+            merged_values.append(merged)
+        for data_position, position in enumerate(column_positions):
+            merged = merged_values[position]
+            values = self._to_array(data.iloc[:, data_position], merged.dtype)
+            is_valid = ~pd.isna(values)
+            merged[data_rows[is_valid]] = values[is_valid]
+
+        self._size = n_kept
+        self._write_rows(merged_time_ns, merged_values)
+        if self.max_age is not None:
+            self._drop_old_rows()
+
+    def to_frame(self):
+        """Get the rows of the buffer as dataframe.
+
+        Returns
+        -------
+        data : pandas DataFrame
+            Rows in ascending order of time, with the same columns and
+            index name as the appended data.
+        """
+        positions = self._ordered_positions()
+        data = pd.DataFrame(
+            {position: values[positions] for position, values in enumerate(self._values)},
+            index=pd.TimedeltaIndex(
+                self._time[positions].astype("timedelta64[ns]"), name=self.index_name
+            ),
+            columns=range(len(self._values))
+        )
+        data.columns = list(self.columns)
+        return data
+
+    def clear(self):
+        """Remove all rows, the columns are kept."""
+
+        self._start, self._size = 0, 0
+
+    def _ordered_positions(self):
+        return (self._start + np.arange(self._size)) % self._capacity
+
+    def _get_column_positions(self, columns):
+        # The n-th column of a name in data is the n-th column of the
+        # name in the buffer, as ports of several devices share names
+        positions = []
+        n_occurrences = {}
+        for column in columns:
+            occurrence = n_occurrences.get(column, 0)
+            n_occurrences[column] = occurrence + 1
+            matches = [
+                position for position, name in enumerate(self.columns) if name == column
+            ]
+            if occurrence < len(matches):
+                positions.append(matches[occurrence])
+            else:
+                self._add_column(column)
+                positions.append(len(self.columns) - 1)
+        return positions
+
+    def _add_column(self, column):
+        # Columns start numeric and become objects once non-numeric
+        # values arrive, as ports without values yet are object columns
+        self._values.append(np.full(self._capacity, np.nan, dtype=np.float64))
+        self.columns.append(column)
+
+    def _update_dtype(self, position, values):
+        if self._values[position].dtype == object or pd.api.types.is_numeric_dtype(values):
+            return
+        inferred = pd.api.types.infer_dtype(values, skipna=True)
+        if inferred not in ["empty", "floating", "integer", "mixed-integer-float", "boolean"]:
+            self._values[position] = self._values[position].astype(object)
+
+    def _write_rows(self, time_ns, values):
+        n_rows = len(time_ns)
+        if self.max_rows and n_rows >= self.max_rows:
+            # Only the newest max_rows rows are kept
+            time_ns = time_ns[-self.max_rows:]
+            values = [column_values[-self.max_rows:] for column_values in values]
+            n_rows = self.max_rows
+            self._start, self._size = 0, 0
+        elif not self.max_rows and self._size + n_rows > self._capacity:
+            self._resize(max(2 * self._capacity, self._size + n_rows))
+
+        positions = (self._start + self._size + np.arange(n_rows)) % self._capacity
+        self._time[positions] = time_ns
+        for buffered_values, column_values in zip(self._values, values):
+            buffered_values[positions] = column_values
+
+        overflow = max(0, self._size + n_rows - self._capacity)
+        self._start = (self._start + overflow) % self._capacity
+        self._size = self._size + n_rows - overflow
+
+    @staticmethod
+    def _to_array(values, dtype):
+        if dtype == object:
+            return values.to_numpy(dtype=object)
+        return values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def _resize(self, capacity):
+        positions = self._ordered_positions()
+        time_ns = np.zeros(capacity, dtype=np.int64)
+        time_ns[:self._size] = self._time[positions]
+        self._time = time_ns
+        for index, values in enumerate(self._values):
+            resized = np.full(capacity, np.nan, dtype=values.dtype)
+            resized[:self._size] = values[positions]
+            self._values[index] = resized
+        self._capacity = capacity
+        self._start = 0
+
+    def _drop_old_rows(self):
+        time_ns = self._time[self._ordered_positions()]
+        cutoff = time_ns[-1] - pd.Timedelta(seconds=self.max_age).value
+        n_old = int(np.searchsorted(time_ns, cutoff, side="left"))
+        self._start = (self._start + n_old) % self._capacity
+        self._size -= n_old
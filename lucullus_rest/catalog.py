@@ -0,0 +1,196 @@
+# MIT License
+# Copyright \(c\) 2023-2024 ZHAW (Institute of Embedded Systems at Zurich University of Applied Sciences) & Securecell AG
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# https://mit-license.org/
+
+"""Catalog of the media and recipes of many processes, for queries
+across batches."""
+
+import json
+import os
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from lucullus_rest import core
+from lucullus_rest.utils import LazyModule
+
+pd = LazyModule("pandas")
+
+class Catalog:
+    """Media and recipes of several processes with an index from
+    recipes, lots and ingredients to processes.
+
+    Every recipe referenced by the media of the processes is
+    requested only once, concurrently over the session of the read
+    client, and kept in memory. If directory is set, the recipes are
+    also stored there and loaded from there instead of requested
+    again, e.g. in the next session.
+
+    Attributes
+    ----------
+    auth : tuple
+        Tuple of username and password.
+    directory : str or None, default None
+        Directory where recipes are stored as json files. If None,
+        recipes are only kept in memory.
+    max_workers : int, default 8
+        Maximum number of concurrent requests.
+    media : pandas DataFrame
+        Media tables (see get_media_table) of all added processes,
+        with the processes as first index level "Process".
+    recipes : dict
+        Recipe tables (see get_recipe_table) with the recipe IDs as
+        keys.
+
+    Examples
+    --------
+    >>> catalog = Catalog(auth, directory="recipes")
+    >>> catalog.add_processes(["Process_1", "Process_2", "Process_3"])
+    >>> catalog.find(recipe="YEP", ingredient="Glucose")
+    ['Process_1', 'Process_3']
+    """
+
+    def __init__(self, auth, directory=None, max_workers=8):
+        """Initialize the Catalog class."""
+
+        self.auth = auth
+        self.directory = directory
+        self.max_workers = max_workers
+        self.media = pd.DataFrame()
+        self.recipes = {}
+        self._recipe_names = {}
+        self._index = {"recipe": {}, "lot": {}, "ingredient": {}}
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def add_processes(self, processes):
+        """Add the media of processes and all recipes they reference
+        to the catalog.
+
+        Parameters
+        ----------
+        processes : list of int or list of str
+            Process names or IDs. Processes that are already in the
+            catalog are not requested again.
+        """
+        processes = [
+            process for process in processes
+            if self.media.empty or process not in self.media.index.get_level_values("Process")
+        ]
+        media = core.get_media_tables(processes, self.auth, max_workers=self.max_workers)
+        if media.empty:
+            return
+
+        recipe_ids = [
+            recipe_id for recipe_id in media["recipe_id"].unique()
+            if recipe_id not in self.recipes
+        ]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for recipe_id, json_data in zip(recipe_ids, executor.map(self._load_recipe, recipe_ids)):
+                if json_data is not None:
+                    self.recipes[recipe_id] = core.parse_recipe_table(json_data)
+                    self._recipe_names[json_data["data"]["name"]] = recipe_id
+
+        self.media = pd.concat([self.media, media]) if not self.media.empty else media
+        self._update_index(media)
+
+    def _load_recipe(self, recipe_id):
+        """Load json response of recipe from directory or request it."""
+        path = os.path.join(self.directory, f"recipe_{recipe_id}.json") if self.directory else None
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                return json.load(file)
+        try:
+            json_data = core.get_client().get_json(f"recipes/{recipe_id}", self.auth)
+        except requests.HTTPError as err:
+            warnings.warn(f"Request for recipe '{recipe_id}' failed. {err}")
+            return None
+        if path:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(json_data, file)
+        return json_data
+
+    def _update_index(self, media):
+        """Add media to the index, under IDs and names."""
+        with self._lock:
+            for row in media.reset_index(level=0).itertuples(index=False):
+                process = row.Process
+                for key in [row.recipe_id, row.recipe_name]:
+                    self._index["recipe"].setdefault(key, set()).add(process)
+                for key in [row.lot_id, row.lot_name]:
+                    if key is not None and not pd.isna(key):
+                        self._index["lot"].setdefault(key, set()).add(process)
+                recipe_table = self.recipes.get(row.recipe_id)
+                if recipe_table is None or "ingredientId" not in recipe_table:
+                    continue
+                ingredients = recipe_table.loc[
+                    recipe_table["ingredient"] != "", ["ingredientId", "ingredient"]
+                ]
+                for key in set(ingredients["ingredientId"].astype(int)) | set(ingredients["ingredient"]):
+                    self._index["ingredient"].setdefault(key, set()).add(process)
+
+    def find(self, recipe=None, lot=None, ingredient=None):
+        """Find processes whose media contain a recipe, lot and
+        ingredient.
+
+        Parameters
+        ----------
+        recipe : int or str, default None
+            Recipe ID or name.
+        lot : int or str, default None
+            Lot ID or name.
+        ingredient : int or str, default None
+            Ingredient ID or name.
+
+        Returns
+        -------
+        processes : list
+            Processes as they were added that match all given
+            criteria, sorted.
+        """
+        criteria = {"recipe": recipe, "lot": lot, "ingredient": ingredient}
+        processes = None
+        with self._lock:
+            for kind, key in criteria.items():
+                if key is None:
+                    continue
+                matches = self._index[kind].get(key, set())
+                processes = set(matches) if processes is None else processes & matches
+        if processes is None:
+            processes = set(self.media.index.get_level_values("Process")) if not self.media.empty else set()
+        return sorted(processes, key=str)
+
+    def recipe_table(self, recipe):
+        """Get recipe table from the catalog.
+
+        Parameters
+        ----------
+        recipe : int or str
+            Recipe ID or name.
+
+        Returns
+        -------
+        recipe_table : pandas DataFrame
+            Recipe table, see get_recipe_table.
+        """
+        return self.recipes[self._recipe_names.get(recipe, recipe)]
@@ -0,0 +1,682 @@
+# MIT License
+# Copyright \(c\) 2023-2024 ZHAW (Institute of Embedded Systems at Zurich University of Applied Sciences) & Securecell AG
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# https://mit-license.org/
+
+"""Connections to Lucullus servers that can be configured at runtime.
+
+Requests are sent by role: "export" for signal downloads, "read" for
+all other reads and "write" for setting values and attributes. Every
+role can be pointed to its own server with configure or with
+environment variables, e.g.::
+
+    LUCULLUS_REST_URL=http://10.0.0.1:8080/lpims/rest/v1/
+    LUCULLUS_EXPORT_REST_URL=http://10.0.0.2:8080/lpims/rest/v1/
+    LUCULLUS_EXPORT_POOL_SIZE=20
+
+Roles without configuration fall back to "read", and "read" and
+"write" fall back to REST_URL and TIMEOUT of core.
+
+Responses of reads can be cached with a ResponseCache, set with
+configure or with LUCULLUS_CACHE=true or LUCULLUS_CACHE_DIR=<path>.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+import requests
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROLES = ("export", "read", "write")
+
+# Size in bytes of the chunks responses are read and decompressed in
+CHUNK_SIZE = 65536
+
+# Profile the current thread records in, set by lucullus_rest.profiling
+_profiling = threading.local()
+
+# Time in seconds responses of static resources are used without asking
+# the server, by prefix of the requested path.
+DEFAULT_TTL_RULES = {
+    "recipes/": 3600,
+    "attributedefinitions": 3600,
+    "ports": 3600,
+}
+
+_FALLBACK_ROLES = {"export": "read", "read": None, "write": None}
+
+class ResponseCache:
+    """Cache of parsed json responses, kept in memory and optionally
+    on disk, each bounded in size by evicting the least recently used
+    responses.
+
+    Responses are used without asking the server for as long as the
+    time to live of their path (ttl_rules) has not passed. Afterward,
+    or for paths without time to live, responses with an ETag or
+    Last-Modified header are revalidated with a conditional request,
+    so unchanged responses are not downloaded again. Responses with
+    neither a time to live nor validators are not cached.
+
+    Attributes
+    ----------
+    max_size : int, default=100_000_000
+        Maximum size in bytes of the responses kept in memory.
+    directory : str, default=None
+        Directory responses are additionally stored in. If None,
+        responses are only kept in memory.
+    max_disk_size : int, default=1_000_000_000
+        Maximum size in bytes of the responses stored in directory.
+    ttl_rules : dict, default=DEFAULT_TTL_RULES
+        Time to live in seconds by prefix of the requested path.
+    finished_ttl : float, default=86400
+        Time to live in seconds of signals of finished processes (see
+        core.FINISHED_STATES and core.get_signals).
+    stats : collections.Counter
+        Number of responses used without request ('hits'), after
+        revalidation ('revalidated') and requested ('misses').
+    """
+
+    def __init__(self, max_size=100_000_000, directory=None, max_disk_size=1_000_000_000,
+            ttl_rules=None, finished_ttl=86400):
+        """Initialize the ResponseCache class."""
+
+        self.max_size = max_size
+        self.directory = directory
+        self.max_disk_size = max_disk_size
+        self.ttl_rules = DEFAULT_TTL_RULES if ttl_rules is None else ttl_rules
+        self.finished_ttl = finished_ttl
+        self.stats = Counter()
+
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get_ttl(self, path):
+        """Get time to live in seconds of responses of path, 0 if
+        there is no rule for path."""
+
+        for prefix, ttl in self.ttl_rules.items():
+            if path.startswith(prefix):
+                return ttl
+        return 0
+
+    def get(self, key):
+        """Get cached entry of key, or None if there is none.
+
+        An entry is a dictionary with the keys 'json', 'etag',
+        'last_modified', 'stored_at' and 'size'.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = self._read_file(key)
+        if entry is not None:
+            self._add(key, entry)
+        return entry
+
+    def put(self, key, json_data, etag=None, last_modified=None, size=0):
+        """Store json response of key."""
+
+        entry = {
+            "json": json_data,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+            "size": size,
+        }
+        self._add(key, entry)
+        self._write_file(key, entry)
+
+    def refresh(self, key):
+        """Mark entry of key as just stored, e.g. after the server
+        confirmed that it is unchanged."""
+
+        entry = self.get(key)
+        if entry is not None:
+            entry["stored_at"] = time.time()
+            self._write_file(key, entry)
+
+    def clear(self):
+        """Remove all responses from memory and disk."""
+
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        for file_path in self._files():
+            os.remove(file_path)
+
+    def _add(self, key, entry):
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)["size"]
+            if entry["size"] > self.max_size:
+                return
+            self._entries[key] = entry
+            self._size += entry["size"]
+            while self._size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted["size"]
+
+    def _file_path(self, key):
+        return os.path.join(
+            self.directory, hashlib.sha256(repr(key).encode()).hexdigest() + ".json"
+        )
+
+    def _files(self):
+        if not self.directory:
+            return []
+        return [
+            os.path.join(self.directory, file_name)
+            for file_name in os.listdir(self.directory)
+            if file_name.endswith(".json")
+        ]
+
+    def _read_file(self, key):
+        if not self.directory:
+            return None
+        file_path = self._file_path(key)
+        try:
+            with open(file_path, encoding="utf-8") as file:
+                entry = json.load(file)
+            os.utime(file_path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def _write_file(self, key, entry):
+        if not self.directory:
+            return
+        try:
+            with open(self._file_path(key), "w", encoding="utf-8") as file:
+                json.dump(entry, file)
+        except OSError:
+            return
+
+        files = sorted(self._files(), key=os.path.getmtime)
+        disk_size = sum(os.path.getsize(file_path) for file_path in files)
+        for file_path in files:
+            if disk_size <= self.max_disk_size:
+                break
+            disk_size -= os.path.getsize(file_path)
+            os.remove(file_path)
+
+class Client:
+    """Connection to a Lucullus server with a persistent session and
+    a pool of connections.
+
+    Attributes
+    ----------
+    rest_url : str
+        REST URL of the server, e.g.
+        'http://10.0.0.1:8080/lpims/rest/v1/'.
+    timeout : float, default=20
+        Timeout in seconds of requests.
+    pool_size : int, default=10
+        Maximum number of connections kept open to the server, should
+        be at least the number of concurrent requests.
+    unattended : bool, default=False
+        If True, requests are marked as unattended requests.
+    single_flight : bool, default=True
+        If True, concurrent identical requests of get_json share one
+        request to the server and its parsed response.
+    cache : ResponseCache, default=None
+        Cache for responses of get_json. If None, responses are not
+        cached.
+    compression : bool, default=True
+        If True, get_json asks for gzip or deflate compressed
+        responses, and for brotli if the brotli package is installed.
+        Responses are decompressed chunk by chunk while they arrive.
+    session : requests.Session
+        Session used for all requests.
+    stats : collections.Counter
+        Number of requests sent to the server ('requests'), of
+        requests of get_json that shared the response of a concurrent
+        identical request ('shared'), and of bytes of responses of
+        get_json as transferred ('bytes_received') and after
+        decompression ('bytes_decoded').
+    """
+
+    def __init__(self, rest_url, timeout=20, pool_size=10, unattended=False, single_flight=True,
+            cache=None, compression=True):
+        """Initialize the Client class."""
+
+        self.rest_url = rest_url if rest_url.endswith("/") else rest_url + "/"
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.unattended = unattended
+        self.single_flight = single_flight
+        self.cache = cache
+        self.compression = compression
+        self.stats = Counter()
+
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}({self.rest_url!r}, timeout={self.timeout}, "
+            f"pool_size={self.pool_size})"
+        )
+
+    def request(self, method, path, auth, **kwargs):
+        """Send request to the server.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method, e.g. "GET" or "PUT".
+        path : str
+            Path relative to the REST URL, e.g. 'processes?name=X'.
+        auth : tuple
+            Tuple of username and password.
+        **kwargs
+            Passed on to requests.Session.request.
+
+        Returns
+        -------
+        response : requests.Response
+            Response of the server.
+        """
+        if self.unattended:
+            kwargs.setdefault("params", {}).update({"UNATTENDED_REQUEST": "true"})
+        kwargs.setdefault("timeout", self.timeout)
+        with self._lock:
+            self.stats["requests"] += 1
+        return self.session.request(method, self.rest_url + path, auth=auth, **kwargs)
+
+    def get(self, path, auth, **kwargs):
+        """Send GET request to the server, see request."""
+        return self.request("GET", path, auth, **kwargs)
+
+    def put(self, path, auth, **kwargs):
+        """Send PUT request to the server, see request."""
+        return self.request("PUT", path, auth, **kwargs)
+
+    def get_json(self, path, auth, ttl=None):
+        """Send GET request to the server and parse the json response.
+
+        If single_flight is True and the same path is already being
+        requested with the same auth by another thread, no new request
+        is sent, the response of the other request is returned
+        instead. If the client has a cache, cached responses are used
+        as described in ResponseCache. The returned json may thus be
+        shared and should not be modified.
+
+        Parameters
+        ----------
+        path : str
+            Path relative to the REST URL, e.g. 'processes?name=X'.
+        auth : tuple
+            Tuple of username and password.
+        ttl : float, default=None
+            Time to live in seconds of the cached response. If None,
+            the ttl_rules of the cache are used.
+
+        Returns
+        -------
+        json_data : dict
+            Parsed json response.
+
+        Raises
+        ------
+        requests.HTTPError
+            If the status code of the response is not 200.
+        """
+        if not self.single_flight:
+            return self._get_json(path, auth, ttl)
+
+        key = (path, tuple(auth) if auth else auth)
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.stats["shared"] += 1
+        if not is_owner:
+            return future.result()
+
+        try:
+            json_data = self._get_json(path, auth, ttl)
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        else:
+            future.set_result(json_data)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return json_data
+
+    def _get_json(self, path, auth, ttl):
+        if self.cache is None:
+            status_code, _, json_data, _ = self._fetch(path, auth, {})
+            if status_code != 200:
+                raise requests.HTTPError(f"Status code of request response was {status_code}.")
+            return json_data
+
+        # Responses may differ between users, so the credentials are part of the key
+        key = (self.rest_url, path, auth_key(auth))
+        ttl = self.cache.get_ttl(path) if ttl is None else ttl
+        entry = self.cache.get(key)
+        headers = {}
+        if entry is not None:
+            if time.time() - entry["stored_at"] < ttl:
+                self.cache.stats["hits"] += 1
+                return entry["json"]
+            if entry["etag"]:
+                headers.update({"If-None-Match": entry["etag"]})
+            if entry["last_modified"]:
+                headers.update({"If-Modified-Since": entry["last_modified"]})
+
+        status_code, response_headers, json_data, size = self._fetch(path, auth, headers)
+        if status_code == 304 and entry is not None:
+            self.cache.stats["revalidated"] += 1
+            self.cache.refresh(key)
+            return entry["json"]
+        if status_code != 200:
+            raise requests.HTTPError(f"Status code of request response was {status_code}.")
+
+        self.cache.stats["misses"] += 1
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if ttl > 0 or etag or last_modified:
+            self.cache.put(key, json_data, etag, last_modified, size=size)
+        return json_data
+
+    def _fetch(self, path, auth, headers):
+        """Send GET request and decompress and parse the response while
+        counting the transferred bytes.
+
+        Returns
+        -------
+        status_code : int
+            Status code of the response.
+        headers : requests.structures.CaseInsensitiveDict
+            Headers of the response.
+        json_data : dict or None
+            Parsed json response, None if the status code is not 200.
+        size : int
+            Size in bytes of the decompressed response.
+        """
+        headers = dict(headers)
+        if self.compression:
+            headers.update({"Accept-Encoding": "gzip, deflate" + (", br" if brotli else "")})
+        else:
+            headers.update({"Accept-Encoding": "identity"})
+
+        response = self.get(path, auth, headers=headers, stream=True)
+        try:
+            if response.status_code != 200:
+                return response.status_code, response.headers, None, 0
+
+            decompressor = _get_decompressor(response.headers.get("Content-Encoding"))
+            chunks = []
+            bytes_received = 0
+            for chunk in response.raw.stream(CHUNK_SIZE, decode_content=False):
+                bytes_received += len(chunk)
+                chunks.append(decompressor.decompress(chunk) if decompressor else chunk)
+            if decompressor:
+                chunks.append(decompressor.flush())
+            body = b"".join(chunks)
+        finally:
+            response.close()
+
+        with self._lock:
+            self.stats["bytes_received"] += bytes_received
+            self.stats["bytes_decoded"] += len(body)
+        profile = getattr(_profiling, "profile", None)
+        if profile is None:
+            json_data = json.loads(body)
+        else:
+            with profile.stage("json_decode"):
+                json_data = json.loads(body)
+        return response.status_code, response.headers, json_data, len(body)
+
+    def close(self):
+        """Close all connections of the session."""
+        self.session.close()
+
+def auth_key(auth):
+    """Get key of the credentials for caches of responses.
+
+    The key is a hash of username and password, so a wrong password
+    never matches the cached responses of a user and the password is
+    not stored in the cache.
+
+    Parameters
+    ----------
+    auth : tuple or None
+        Tuple of username and password.
+
+    Returns
+    -------
+    key : str or None
+        Hexadecimal SHA-256 hash of the credentials, None without
+        credentials.
+    """
+    if not auth:
+        return None
+    return hashlib.sha256("\0".join(str(part) for part in auth).encode()).hexdigest()
+
+class _BrotliDecompressor:
+    """Brotli decompressor with the interface of zlib.decompressobj."""
+
+    def __init__(self):
+        self._decompressor = brotli.Decompressor()
+
+    def decompress(self, data):
+        return self._decompressor.process(data)
+
+    def flush(self):
+        return b""
+
+class _DeflateDecompressor:
+    """Deflate decompressor that falls back to raw deflate data when
+    the zlib header is missing, as sent by some servers."""
+
+    def __init__(self):
+        self._decompressor = None
+        self._header = b""
+
+    def decompress(self, data):
+        if self._decompressor is None:
+            # The first two bytes tell whether there is a zlib header
+            self._header += data
+            if len(self._header) < 2:
+                return b""
+            data, self._header = self._header, b""
+            is_zlib = data[0] & 0x0F == 8 and (data[0] << 8 | data[1]) % 31 == 0
+            # Negative wbits reads raw deflate data without header
+            self._decompressor = zlib.decompressobj(
+                zlib.MAX_WBITS if is_zlib else -zlib.MAX_WBITS
+            )
+        return self._decompressor.decompress(data)
+
+    def flush(self):
+        if self._decompressor is None:
+            return zlib.decompress(self._header, -zlib.MAX_WBITS) if self._header else b""
+        return self._decompressor.flush()
+
+def _get_decompressor(content_encoding):
+    """Get decompressor for the Content-Encoding of a response, None
+    if it is not compressed."""
+
+    content_encoding = (content_encoding or "identity").strip().lower()
+    if content_encoding in ["gzip", "x-gzip"]:
+        # wbits of 32 + MAX_WBITS detects the gzip or zlib header
+        return zlib.decompressobj(32 + zlib.MAX_WBITS)
+    if content_encoding == "deflate":
+        return _DeflateDecompressor()
+    if content_encoding == "br" and brotli is not None:
+        return _BrotliDecompressor()
+    if content_encoding == "identity":
+        return None
+    raise requests.HTTPError(f"Content encoding '{content_encoding}' is not supported.")
+
+_clients = {}
+_default_clients = {}
+_lock = threading.Lock()
+_env_loaded = False
+
+def configure(rest_url, roles=("read", "write"), timeout=20, pool_size=10, unattended=False,
+        cache=None):
+    """Send requests of roles to the server at rest_url.
+
+    Parameters
+    ----------
+    rest_url : str
+        REST URL of the server.
+    roles : str or tuple of str, default=("read", "write")
+        Roles of requests sent to the server, out of "export",
+        "read" and "write". "export" falls back to "read".
+    timeout : float, default=20
+        Timeout in seconds of requests.
+    pool_size : int, default=10
+        Maximum number of connections kept open to the server.
+    unattended : bool, default=False
+        If True, requests are marked as unattended requests.
+    cache : ResponseCache, default=None
+        Cache for responses. If None, responses are not cached.
+
+    Returns
+    -------
+    client : Client
+        Client used for the roles.
+
+    Examples
+    --------
+    >>> configure("http://10.0.0.1:8080/lpims/rest/v1/")
+    >>> configure("http://10.0.0.2:8080/lpims/rest/v1/", roles="export", pool_size=20)
+    >>> configure("http://10.0.0.1:8080/lpims/rest/v1/", cache=ResponseCache(directory="cache"))
+    """
+    roles = (roles,) if isinstance(roles, str) else tuple(roles)
+    for role in roles:
+        if role not in ROLES:
+            raise ValueError(f"Unknown role '{role}', use one of {ROLES}.")
+
+    client = Client(
+        rest_url, timeout=timeout, pool_size=pool_size, unattended=unattended, cache=cache
+    )
+    with _lock:
+        _load_env()
+        _clients.update({role: client for role in roles})
+    return client
+
+def reset_configuration():
+    """Remove all configured clients, requests are sent to REST_URL
+    of core again."""
+
+    global _env_loaded
+    with _lock:
+        _clients.clear()
+        _env_loaded = True
+
+def get_configured_client(role):
+    """Get client configured for role.
+
+    Parameters
+    ----------
+    role : {"export", "read", "write"}
+        Role of request.
+
+    Returns
+    -------
+    client : Client or None
+        Client configured with configure or environment variables for
+        the role or its fallback role, None if there is none.
+    """
+    with _lock:
+        _load_env()
+        while role is not None:
+            if role in _clients:
+                return _clients[role]
+            role = _FALLBACK_ROLES[role]
+    return None
+
+def get_default_client(rest_url, timeout):
+    """Get client for rest_url and timeout, one client is kept per
+    combination, so the session is reused.
+
+    Parameters
+    ----------
+    rest_url : str
+        REST URL of the server.
+    timeout : float
+        Timeout in seconds of requests.
+
+    Returns
+    -------
+    client : Client
+        Client for rest_url and timeout.
+    """
+    with _lock:
+        key = (rest_url, timeout)
+        if key not in _default_clients:
+            _default_clients[key] = Client(rest_url, timeout=timeout)
+        return _default_clients[key]
+
+def _load_env():
+    """Configure clients from environment variables once, call with
+    _lock held."""
+
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+
+    for prefix, roles in [("LUCULLUS_", ("read", "write"))] + [
+        (f"LUCULLUS_{role.upper()}_", (role,)) for role in ROLES
+    ]:
+        rest_url = os.environ.get(prefix + "REST_URL")
+        if rest_url:
+            cache_directory = os.environ.get(prefix + "CACHE_DIR")
+            is_cached = os.environ.get(prefix + "CACHE", "").lower() in ["1", "true"]
+            client = Client(
+                rest_url,
+                timeout=float(os.environ.get(prefix + "TIMEOUT", 20)),
+                pool_size=int(os.environ.get(prefix + "POOL_SIZE", 10)),
+                unattended=os.environ.get(prefix + "UNATTENDED", "").lower() in ["1", "true"],
+                cache=(
+                    ResponseCache(directory=cache_directory)
+                    if is_cached or cache_directory else None
+                ),
+            )
+            _clients.update({role: client for role in roles})
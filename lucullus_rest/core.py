@@ -29,17 +29,33 @@ import warnings
 import os
 import json
 import time
+import threading
+import traceback
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from datetime import datetime, timedelta, timezone
 from ipaddress import ip_address
+from urllib.parse import urljoin, urlsplit
 import requests
-import numpy as np
-import pandas as pd
-from lucullus_rest.utils import dictionaries_to_df
-import traceback
-
+from lucullus_rest.client import auth_key, get_configured_client, get_default_client
+from lucullus_rest.buffer import RingBuffer
+from lucullus_rest.profiling import profile_stage
+from lucullus_rest.shared import SharedFrame, call_with_frame
+from lucullus_rest.utils import LazyModule, resample_df
+
+# numpy and pandas are only imported when first needed
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+# Used for all requests unless other servers are configured with configure
+# or environment variables (see lucullus_rest.client).
 REST_URL = "http://XXX.XXX.XXX.XXX:8080/lpims/rest/v1/"
 UNATTENDED_REQUEST = "?UNATTENDED_REQUEST=true"
 TIMEOUT = 20
+PAGE_SIZE = None
+CHECKPOINT_VERSION = 1
+# Process states whose signals do not change anymore
+FINISHED_STATES = ("Finished",)
 
 try:
     ip_address(REST_URL.split("http://")[1].split(":8080")[0])
@@ -49,7 +65,279 @@ except ValueError:
         "Change the IP adress to the IP adress of your server."
     )
 
-def get_name_to_id_dict(resource_type, auth):
+def get_client(role="read"):
+    """Get client that requests of a role are sent with.
+
+    Parameters
+    ----------
+    role : {"read", "export", "write"}, default="read"
+        Role of request, "export" for signal downloads, "read" for
+        other reads and "write" for setting values and attributes.
+
+    Returns
+    -------
+    client : Client
+        Client configured for the role, or a client for REST_URL and
+        TIMEOUT if there is none.
+    """
+    client = get_configured_client(role)
+    if client is None:
+        client = get_default_client(REST_URL, TIMEOUT)
+    return client
+
+def iter_resources(path, auth, page_size=None, prefetch=True):
+    """Iterate over the items of a list endpoint, e.g. 'processes'.
+
+    If the server splits the list into pages, the pages are requested
+    on demand, following the 'next' link of every page. If page_size
+    is set, pages of this size are requested with the 'page[offset]'
+    and 'page[limit]' query parameters. No further pages are
+    requested once the caller stops iterating.
+
+    Parameters
+    ----------
+    path : str
+        Path of the list endpoint relative to the REST URL, e.g.
+        'processes' or 'processes?running=true'.
+    auth : tuple
+        Tuple of username and password.
+    page_size : int, default=None
+        Number of items per page. If None, uses PAGE_SIZE, and if
+        that is None as well, the server decides.
+    prefetch : bool, default=True
+        If True, the next page is requested in the background while
+        the items of the current page are consumed.
+
+    Yields
+    ------
+    item : dict
+        Item of the list.
+    """
+    client = get_client()
+    page_size = page_size if page_size is not None else PAGE_SIZE
+    offset = 0
+    next_path = _page_path(path, offset, page_size) if page_size else path
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        next_page = None
+        while next_path:
+            if next_page is not None:
+                json_data = next_page.result()
+            else:
+                json_data = client.get_json(next_path, auth)
+            data = json_data["data"]
+
+            next_link = (json_data.get("links") or {}).get("next")
+            if next_link:
+                next_path = _relative_path(client.rest_url, next_link)
+            elif page_size and len(data) == page_size:
+                offset += len(data)
+                next_path = _page_path(path, offset, page_size)
+            else:
+                next_path = None
+
+            next_page = None
+            if next_path and executor is not None:
+                next_page = executor.submit(client.get_json, next_path, auth)
+            yield from data
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def _relative_path(rest_url, link):
+    """Get path of a link relative to the REST URL. Absolute links may
+    use another host name for the server, so only the path of the API
+    is removed."""
+    api_path = urlsplit(rest_url).path
+    link = urlsplit(urljoin(rest_url, link))
+    if not link.path.startswith(api_path):
+        raise ValueError(f"Link '{link.geturl()}' is not part of the REST-API at '{rest_url}'.")
+    path = link.path[len(api_path):]
+    return f"{path}?{link.query}" if link.query else path
+
+def _page_path(path, offset, page_size):
+    separator = "&" if "?" in path else "?"
+    return f"{path}{separator}page[offset]={offset}&page[limit]={page_size}"
+
+class NameRegistry:
+    """Mapping between names and IDs of a resource type in both
+    directions.
+
+    The registry is filled incrementally: names and IDs that are not
+    known yet are requested one by one, and refresh replaces the
+    registry with all resources of the list endpoint page by page
+    (see iter_resources), so renamed and removed resources are
+    updated.
+
+    Attributes
+    ----------
+    resource_type : {"ports", "processes", "reactors", "attributedefinitions"}
+        Type of resource.
+    auth : tuple
+        Tuple of username and password.
+    ids : dict
+        Dictionary with names as keys and lists of IDs as values,
+        more than one ID for duplicate names.
+    names : dict
+        Dictionary with IDs as keys and names as values.
+    complete : bool
+        True if all resources were added by refresh.
+    """
+
+    def __init__(self, resource_type, auth):
+        """Initialize the NameRegistry class."""
+
+        self.resource_type = resource_type
+        self.auth = auth
+        self.ids = {}
+        self.names = {}
+        self.complete = False
+        self._lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def duplicates(self):
+        """Dictionary of names with more than one ID, and their IDs."""
+        with self._lock:
+            return {name: list(ids) for name, ids in self.ids.items() if len(ids) > 1}
+
+    def add(self, items):
+        """Add resources to the registry.
+
+        Parameters
+        ----------
+        items : iterable of dict
+            Resources with 'name' and 'id'.
+        """
+        with self._lock:
+            for item in items:
+                resource_id, name = item["id"], item["name"]
+                if self.names.get(resource_id) == name:
+                    continue
+                if resource_id in self.names:
+                    # The resource was renamed
+                    self._remove(resource_id)
+                self.names[resource_id] = name
+                ids = self.ids.setdefault(name, [])
+                ids.append(resource_id)
+                if len(ids) == 2:
+                    warnings.warn(
+                        f"There are several {self.resource_type} named '{name}',"
+                        f" using the first one with ID {ids[0]}."
+                    )
+
+    def refresh(self, page_size=None):
+        """Replace the registry with all resources of the list
+        endpoint, resources that are not listed anymore are removed.
+
+        Parameters
+        ----------
+        page_size : int, default=None
+            Number of resources per page, see iter_resources.
+        """
+        items = list(iter_resources(self.resource_type, self.auth, page_size=page_size))
+        listed_ids = {item["id"] for item in items}
+        with self._lock:
+            for resource_id in [key for key in self.names if key not in listed_ids]:
+                self._remove(resource_id)
+        self.add(items)
+        self.complete = True
+
+    def get_id(self, name):
+        """Get ID of a name, the first one for duplicate names.
+
+        Parameters
+        ----------
+        name : str
+            Name of resource.
+
+        Returns
+        -------
+        resource_id : int
+            ID of resource.
+
+        Raises
+        ------
+        KeyError
+            If there is no resource with this name.
+        """
+        if name not in self.ids:
+            self.add(get_client().get_json(f"{self.resource_type}?name={name}", self.auth)["data"])
+        with self._lock:
+            return self.ids[name][0]
+
+    def get_name(self, resource_id):
+        """Get name of an ID.
+
+        Parameters
+        ----------
+        resource_id : int
+            ID of resource.
+
+        Returns
+        -------
+        name : str
+            Name of resource.
+
+        Raises
+        ------
+        KeyError
+            If there is no resource with this ID.
+        """
+        if resource_id not in self.names:
+            try:
+                json_data = get_client().get_json(f"{self.resource_type}/{resource_id}", self.auth)
+            except requests.HTTPError as err:
+                raise KeyError(resource_id) from err
+            self.add([json_data["data"]])
+        with self._lock:
+            return self.names[resource_id]
+
+    def to_dict(self):
+        """Get dictionary with names as keys and IDs as values, the
+        first ID for duplicate names."""
+        with self._lock:
+            return {name: ids[0] for name, ids in self.ids.items()}
+
+    def _remove(self, resource_id):
+        name = self.names.pop(resource_id)
+        self.ids[name].remove(resource_id)
+        if not self.ids[name]:
+            del self.ids[name]
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+def get_registry(resource_type, auth):
+    """Get registry of names and IDs of a resource type.
+
+    The registry is created once per resource type, server and user
+    and then reused.
+
+    Parameters
+    ----------
+    resource_type : {"ports", "processes", "reactors", "attributedefinitions"}
+        Type of resource.
+    auth : tuple
+        Tuple of username and password.
+
+    Returns
+    -------
+    registry : NameRegistry
+        Registry of the resource type.
+    """
+    key = (get_client().rest_url, resource_type, auth_key(auth))
+    with _registries_lock:
+        if key not in _registries:
+            _registries[key] = NameRegistry(resource_type, auth)
+        return _registries[key]
+
+def get_name_to_id_dict(resource_type, auth, refresh=True):
     """Create dictionary that takes names as keys and IDs
     as values.
 
@@ -59,21 +347,22 @@ def get_name_to_id_dict(resource_type, auth):
         String of type of dictionary.
     auth : tuple
         Tuple of username and password.
+    refresh : bool, default=True
+        If True, the resources are requested again. If False, the
+        registry of the resource type is reused once it is complete
+        (see get_registry), so resources created or renamed since
+        may be missing.
 
     Returns
     -------
         * Dictionary that takes port names (str) as keys
-            and port IDs as values.
+            and port IDs as values. For duplicate names the first ID
+            is used, and a warning is raised.
     """
-    response = requests.get(REST_URL+resource_type, auth=auth, timeout=TIMEOUT)
-    id_dict = {}
-    if response.status_code == 200:
-        json_data = response.json()
-        for port in json_data["data"]:
-            id_dict.update({port["name"]:port["id"]})
-    else:
-        raise requests.HTTPError(f"Status code of request response was {response.status_code}.")
-    return id_dict
+    registry = get_registry(resource_type, auth)
+    if refresh or not registry.complete:
+        registry.refresh()
+    return registry.to_dict()
 
 def get_process_id(process, auth):
     """Get process id from process name.
@@ -94,12 +383,7 @@ def get_process_id(process, auth):
     """
 
     if isinstance(process, str):
-        response = requests.get(REST_URL+f"processes?name={process}", auth=auth, timeout=TIMEOUT)
-        if response.status_code == 200:
-            json_data = response.json()
-            process_id = json_data["data"][0]["id"]
-        else:
-            raise requests.HTTPError(f"Status code of request response was {response.status_code}.")
+        process_id = get_registry("processes", auth).get_id(process)
     elif isinstance(process, int):
         process_id = process
     return process_id
@@ -122,12 +406,8 @@ def get_start_timestamp(process, auth):
         Timestamp of process start.
     """
     process = get_process_id(process, auth)
-    response = requests.get(REST_URL+f"processes/{process}", auth=auth, timeout=TIMEOUT)
-    if response.status_code == 200:
-        json_data = response.json()
-        start_timestamp = json_data["data"]["startTimestamp"]
-    else:
-        raise requests.HTTPError(f"Status code of request response was {response.status_code}.")
+    json_data = get_client().get_json(f"processes/{process}", auth)
+    start_timestamp = json_data["data"]["startTimestamp"]
     return start_timestamp
 
 def get_port_id(port, auth):
@@ -149,12 +429,7 @@ def get_port_id(port, auth):
     """
 
     if isinstance(port, str):
-        response = requests.get(REST_URL+f"ports?name={port}", auth=auth, timeout=TIMEOUT)
-        if response.status_code == 200:
-            json_data = response.json()
-            port_id = json_data["data"][0]["id"]
-        else:
-            raise requests.HTTPError(f"Status code of request response was {response.status_code}.")
+        port_id = get_registry("ports", auth).get_id(port)
     elif isinstance(port, int):
         port_id = port
     return port_id
@@ -180,19 +455,17 @@ def get_signal_id(process, port, auth):
 
     if isinstance(port, str):
         port = get_port_id(port, auth)
-        response = requests.get(REST_URL+f"signals?processId={process}&portId={port}", auth=auth, timeout=TIMEOUT)
-        if response.status_code == 200:
-            json_data = response.json()
-            signal_id = json_data["data"]["id"]
-        else:
-            raise requests.HTTPError(f"Status code of request response was {response.status_code}.")
+        json_data = get_client().get_json(f"signals?processId={process}&portId={port}", auth)
+        signal_id = json_data["data"]["id"]
     else:
         signal_id = port
 
     return signal_id
 
 def export_to_df(process, port_names, auth,
-        interval=0, return_device=False, interpolate=False, backfill=False, devices=None):
+        interval=0, return_device=False, interpolate=False, backfill=False, devices=None,
+        compact_dtypes=False, float_dtype="float64", resampling="server", resample_method="mean",
+        profile=None):
     """Get pandas dataframe of process data of specified process
     and port names with the process time as index.
 
@@ -216,9 +489,26 @@ def export_to_df(process, port_names, auth,
     backfil : bool, default=False
         If true, starting values of columns are backfilled with
         first value of column.
-    devices : list of str, default=None
+    devices : list of str or dict, default=None
         Devices specified for the port, in case there are duplicate
-        port names.
+        port names, see get_signals.
+    compact_dtypes : bool, default=False
+        If true, the port metadata of the process signals is used to
+        store every port in the smallest fitting dtype (see
+        get_df_from_json).
+    float_dtype : {"float64", "float32"}, default="float64"
+        Dtype of floating point ports if compact_dtypes is True.
+    resampling : {"server", "client"}, default="server"
+        Where signals are brought to the interval. If "server", the
+        interval mode of Lucullus is used. If "client", all
+        datapoints are downloaded and all ports are resampled onto a
+        common grid (see utils.resample_df). Ignored if interval is 0.
+    resample_method : {"mean", "last", "linear"} or dict, default="mean"
+        Resampling method, or dictionary of resampling methods per
+        port, if resampling is "client".
+    profile : profiling.Profile, default=None
+        If set, time and memory of the stages of the export are
+        recorded in it (see profiling.Profile).
 
     Returns
     -------
@@ -237,6 +527,8 @@ def export_to_df(process, port_names, auth,
     be disaligned.
     Additionally, the interval function of Lucullus seems to
     sometimes generate fake values. This is under investigation.
+    Both issues are avoided with resampling="client", which
+    resamples all ports onto the same grid.
 
     Examples
     --------
@@ -265,22 +557,49 @@ def export_to_df(process, port_names, auth,
     0.04       99.5             0.0
     """
 
-    json_data = get_signals(process, port_names, auth, interval=interval, devices=devices)
-    process_data = get_df_from_json(json_data)
+    if resampling not in ["server", "client"]:
+        raise ValueError(f"Unknown resampling '{resampling}', use 'server' or 'client'.")
+    server_interval = interval if resampling == "server" else 0
+
+    with profile_stage(profile, "name_resolution"):
+        process = get_process_id(process, auth)
+    json_data = get_signals(
+        process, port_names, auth, interval=server_interval, devices=devices, profile=profile
+    )
+    if compact_dtypes:
+        with profile_stage(profile, "signal_info"):
+            port_types = get_signal_index(process, auth).port_types
+        process_data = get_df_from_json(
+            json_data,
+            compact_dtypes=True,
+            float_dtype=float_dtype,
+            port_types=port_types,
+            profile=profile
+        )
+    else:
+        process_data = get_df_from_json(json_data, profile=profile)
 
-    if interpolate:
-        # df.set_index(["Time [h]"], inplace=True)
-        process_data.interpolate(method=interpolate, inplace=True)
-        # df.reset_index(inplace=True)
-    if backfill:
-        process_data.interpolate(method="backfill", inplace=True)
+    if resampling == "client" and interval:
+        with profile_stage(profile, "resampling"):
+            process_data = resample_df(process_data, interval, method=resample_method)
+
+    with profile_stage(profile, "interpolation"):
+        if interpolate:
+            # df.set_index(["Time [h]"], inplace=True)
+            process_data.interpolate(method=interpolate, inplace=True)
+            # df.reset_index(inplace=True)
+        if backfill:
+            process_data.interpolate(method="backfill", inplace=True)
 
     if return_device:
-        devices = [item["device"]["name"] for item in json_data["data"]]
+        devices = [
+            item["data"]["device"]["name"] if item["data"].get("device") else None
+            for item in json_data
+        ]
         return process_data, devices
     return process_data
 
-def get_signals(process, port_names, auth, interval=0, devices=None):
+def get_signals(process, port_names, auth, interval=0, devices=None, profile=None):
     """Get json file of process data of specified process and port names.
 
     Parameters
@@ -293,44 +612,225 @@ def get_signals(process, port_names, auth, interval=0, devices=None):
         Tuple of user name and password for authentication.
     interval : int, default=0
         Interval in seconds for interpolation of data.
-    devices : list of str, default=None
+    devices : list of str or dict, default=None
         Devices specified for the port, in case there are duplicate
-        port names.
+        port names. Either a list of device names in the same order
+        as port_names, or a dictionary with port names as keys and
+        device names as values. Only the signals of the specified
+        devices are requested. Ports without device (None or not in
+        the dictionary) are requested for all devices.
+    profile : profiling.Profile, default=None
+        If set, time and memory of name resolution, signal info and
+        the request of every port are recorded in it.
 
     Returns
     -------
     json_data : dict
         json file with exported ports of process.
     """
-    process = get_process_id(process, auth)
-    signal_info = get_process_signal_info(process, auth)
-    is_in_port_names = [x in port_names for x in signal_info["portName"]]
-    port_ids = signal_info[is_in_port_names]["portId"].astype("int")
+    with profile_stage(profile, "name_resolution"):
+        process = get_process_id(process, auth)
+    with profile_stage(profile, "signal_info"):
+        signal_index = get_signal_index(process, auth, ports=port_names)
     if devices is None:
-        devices = signal_info[is_in_port_names]["deviceId"].astype("int")
+        signals = signal_index.find(port_names)
     else:
-        raise NotImplementedError("Steve (hatr) is sorry...")
+        if isinstance(devices, dict):
+            devices = [devices.get(port) for port in port_names]
+        elif len(devices) != len(port_names):
+            raise ValueError("devices needs to have the same length as port_names.")
+        signals = []
+        is_refreshed = False
+        for port, device in zip(port_names, devices):
+            if device is None:
+                signals.extend(signal_index.find([port]))
+                continue
+            if (port, device) not in signal_index.signals and not is_refreshed:
+                # The device may have started logging the port after
+                # the index was built
+                signal_index = get_signal_index(process, auth, refresh=True)
+                is_refreshed = True
+            try:
+                signals.append(signal_index.lookup(port, device))
+            except KeyError:
+                warnings.warn(f"Port {port} of device {device} does not exist.")
+    client = get_client("export")
+    ttl = None
+    if client.cache is not None:
+        with profile_stage(profile, "process_state"):
+            if get_process_state(process, auth) in FINISHED_STATES:
+                # Signals of finished processes do not change anymore,
+                # paused or not started processes may still log values
+                ttl = client.cache.finished_ttl
+    signal_names = {}
+    if profile is not None:
+        signal_names = {
+            ids: _signal_label(port, device)
+            for (port, device), ids in signal_index.signals.items()
+        }
     json_data = []
-    for port, dev in zip(port_ids, devices):
-        if np.isnan(dev):
-                port_url = (
-                f"{REST_URL}signals?processId={process}"
+    for signal in signals:
+        _, port, dev = signal
+        if dev is None:
+            port_url = (
+                f"signals?processId={process}"
                 f"&portId={int(port)}&interval={interval}"
             )
         else:
             port_url = (
-                f"{REST_URL}signals?processId={process}"
+                f"signals?processId={process}"
                 f"&portId={int(port)}&deviceId={int(dev)}&interval={interval}"
             )
-        response = requests.get(
-            port_url,
-            auth=auth, timeout=TIMEOUT
-        )
-        if response.status_code != 200:
-            raise requests.HTTPError(f"Status code of request response was {response.status_code}.")
-        json_data.append(response.json())
+        if profile is None:
+            json_data.append(client.get_json(port_url, auth, ttl=ttl))
+        else:
+            with profile.stage("http", port=signal_names.get(signal)):
+                json_data.append(client.get_json(port_url, auth, ttl=ttl))
     return json_data
 
+def _signal_label(port, device):
+    """Get label of a signal in profiles, with the device if there is
+    one."""
+    return port if device is None else f"{port} ({device})"
+
+def get_signal_list(process, auth):
+    """Get list of signals of process as returned by Lucullus.
+
+    Parameters
+    ----------
+    process : str or int
+        Either process name as string or process name as int.
+    auth : tuple
+        Tuple of user name and password for authentication.
+
+    Returns
+    -------
+    signal_list : list of dict
+        Signals associated with process, each with the keys 'id',
+        'port', 'reactor', 'device' and 'subDevice'.
+    """
+    process = get_process_id(process, auth)
+
+    signal_list = get_client().get_json(f"signals?processId={process}", auth)["data"]
+    return signal_list
+
+class SignalIndex:
+    """Index of the signals of a process by port and device name.
+
+    Attributes
+    ----------
+    signals : dict
+        Dictionary with tuples (port name, device name) as keys and
+        tuples (signal ID, port ID, device ID) as values, in the order
+        Lucullus lists the signals. Device name and ID are None for
+        signals without device.
+    port_names : dict
+        Dictionary with port names as keys and lists of the keys of
+        signals of this port as values.
+    port_types : dict
+        Dictionary with port names as keys and the data types
+        reported by Lucullus as values (see get_port_types).
+    """
+
+    def __init__(self, signal_list):
+        """Initialize the SignalIndex class."""
+
+        self.signals = {}
+        self.port_names = {}
+        self.port_types = {}
+        for signal in signal_list:
+            port = signal["port"]
+            device = signal.get("device") or {}
+            key = (port["name"], device.get("name"))
+            self.signals[key] = (signal["id"], port["id"], device.get("id"))
+            self.port_names.setdefault(port["name"], []).append(key)
+            if port.get("dataType") is not None:
+                self.port_types[port["name"]] = port["dataType"]
+
+    def __contains__(self, port):
+        return port in self.port_names
+
+    def lookup(self, port, device=None):
+        """Get IDs of the signal of a port.
+
+        Parameters
+        ----------
+        port : str
+            Port name.
+        device : str, default=None
+            Device name. If None, the first signal of the port is
+            returned.
+
+        Returns
+        -------
+        ids : tuple
+            Tuple of signal ID, port ID and device ID.
+
+        Raises
+        ------
+        KeyError
+            If there is no signal for the port and device.
+        """
+        if device is None:
+            return self.signals[self.port_names[port][0]]
+        return self.signals[(port, device)]
+
+    def find(self, port_names):
+        """Get IDs of all signals of ports in the order Lucullus lists
+        them, including all devices of duplicate port names.
+
+        Parameters
+        ----------
+        port_names : list
+            List of port names, names without signal are ignored.
+
+        Returns
+        -------
+        ids : list of tuple
+            List of tuples of signal ID, port ID and device ID.
+        """
+        port_names = set(port_names)
+        return [ids for key, ids in self.signals.items() if key[0] in port_names]
+
+_signal_indexes = {}
+_signal_indexes_lock = threading.Lock()
+
+def get_signal_index(process, auth, ports=None, refresh=False):
+    """Get index of the signals of a process by port and device name.
+
+    The index is built once per process and server and then reused.
+
+    Parameters
+    ----------
+    process : str or int
+        Either process name as string or process name as int.
+    auth : tuple
+        Tuple of user name and password for authentication.
+    ports : list of str, default=None
+        Ports that are looked up. If one of them is not in the index,
+        e.g. because it was logged after the index was built, the
+        index is built again.
+    refresh : bool, default=False
+        If True, the index is built again.
+
+    Returns
+    -------
+    signal_index : SignalIndex
+        Index of the signals of the process.
+    """
+    process = get_process_id(process, auth)
+    key = (get_client().rest_url, process, auth_key(auth))
+    with _signal_indexes_lock:
+        signal_index = _signal_indexes.get(key)
+
+    if signal_index is not None and ports is not None:
+        refresh = refresh or any(port not in signal_index for port in ports)
+    if signal_index is None or refresh:
+        signal_index = SignalIndex(get_signal_list(process, auth))
+        with _signal_indexes_lock:
+            _signal_indexes[key] = signal_index
+    return signal_index
+
 def get_process_signal_info(process, auth):
     """Get pandas dataframe of info of process signals for process.
 
@@ -346,10 +846,7 @@ def get_process_signal_info(process, auth):
     process_signals : pandas DataFrame
         Pandas dataframe with basic info of signals associated with process.
     """
-    process = get_process_id(process, auth)
-
-    response = requests.get(REST_URL+ f"signals?processId={process}", auth=auth, timeout=TIMEOUT)
-    process_signals = pd.DataFrame(response.json()["data"])
+    process_signals = pd.DataFrame(get_signal_list(process, auth))
 
     for column in ["port", "reactor", "device", "subDevice"]:
         port_info = pd.concat(
@@ -369,13 +866,50 @@ def get_process_signal_info(process, auth):
 
     return process_signals
 
-def get_df_from_json(json_data):
+def get_port_types(signal_info):
+    """Get data types of ports from the signal info of a process.
+
+    Parameters
+    ----------
+    signal_info : pandas DataFrame
+        Signal info of a process as returned by get_process_signal_info.
+
+    Returns
+    -------
+    port_types : dict
+        Dictionary with port names as keys and the data type reported
+        by Lucullus as values. Empty if Lucullus does not report data
+        types for the ports.
+    """
+    if "dataType" not in signal_info.columns:
+        return {}
+    port_types = signal_info[["portName", "dataType"]].dropna()
+    return dict(zip(port_types["portName"], port_types["dataType"]))
+
+def get_df_from_json(json_data, compact_dtypes=False, float_dtype="float64", port_types=None,
+        profile=None):
     """Transform json file into df that is of form as one would get from lucullus export.
 
     Parameters
     ----------
     json_data : dict
         List of Json files that is retrieved from signals.
+    compact_dtypes : bool, default=False
+        If true, every port is stored in the smallest fitting dtype:
+        floating point ports as float_dtype, boolean ports as
+        nullable boolean, integer and on/off ports as the smallest
+        nullable integer and string ports as categoricals. The index
+        is built from integer nanoseconds instead of float hours.
+    float_dtype : {"float64", "float32"}, default="float64"
+        Dtype of floating point ports if compact_dtypes is True.
+    port_types : dict, default=None
+        Dictionary with port names as keys and Lucullus data types as
+        values (see get_port_types). Ports without a data type are
+        inferred from their values.
+    profile : profiling.Profile, default=None
+        If set, time and memory of building the dataframe of every
+        port, concatenating and converting the index and dtypes are
+        recorded in it.
 
     Returns
     -------
@@ -389,22 +923,99 @@ def get_df_from_json(json_data):
     # Yes, rounding the Time to 5 decimal places is weird, but otherwise data
     # from the same timestamp might be misaligned due to rounding errors.
 
-    df_list = [
-        pd.DataFrame(
-            data=x["data"]["values"], columns=["Time [h]", x["data"]["port"]["name"]]
-        ).round({"Time [h]":5}).drop_duplicates(subset="Time [h]").set_index("Time [h]")
-        if "values" in x["data"].keys() 
-        else pd.DataFrame(columns=[x["data"]["port"]["name"]], index=pd.Index(data=[], name="Time [h]"))
-        for x in json_data
-    ]
+    df_list = []
+    for x in json_data:
+        label = _signal_label(
+            x["data"]["port"]["name"], (x["data"].get("device") or {}).get("name")
+        ) if profile is not None else None
+        with profile_stage(profile, "dataframe", port=label):
+            df_list.append(
+                pd.DataFrame(
+                    data=x["data"]["values"], columns=["Time [h]", x["data"]["port"]["name"]]
+                ).round({"Time [h]":5}).drop_duplicates(subset="Time [h]").set_index("Time [h]")
+                if "values" in x["data"].keys()
+                else pd.DataFrame(
+                    columns=[x["data"]["port"]["name"]], index=pd.Index(data=[], name="Time [h]")
+                )
+            )
 
-    export_df = pd.concat(df_list, axis=1, sort=True)
-    # df.index = df.index.astype(float)
-    export_df.index = pd.to_timedelta(export_df.index.astype(float), unit="h")
+    with profile_stage(profile, "concat"):
+        export_df = pd.concat(df_list, axis=1, sort=True)
+    with profile_stage(profile, "index_and_dtypes"):
+        export_df = _convert_index_and_dtypes(export_df, compact_dtypes, float_dtype, port_types)
 
     # df.reset_index(inplace=True)
     return export_df
 
+def _convert_index_and_dtypes(export_df, compact_dtypes, float_dtype, port_types):
+    """Convert the index of hours to timedeltas and, if compact_dtypes
+    is True, the ports to compact dtypes (see get_df_from_json)."""
+    if compact_dtypes:
+        # Hours are converted to integer nanoseconds directly, so the index
+        # never goes through a float timedelta conversion.
+        export_df.index = pd.TimedeltaIndex(
+            np.rint(export_df.index.astype(float).values * 3.6e12).astype("timedelta64[ns]"),
+            name=export_df.index.name
+        )
+        port_types = port_types if port_types else {}
+        # Columns are converted by position, as port names repeat for
+        # ports of several devices
+        if len(export_df.columns):
+            export_df = pd.concat(
+                [
+                    _to_compact_dtype(export_df.iloc[:, idx], port_types.get(column), float_dtype)
+                    for idx, column in enumerate(export_df.columns)
+                ],
+                axis=1
+            )
+    else:
+        # df.index = df.index.astype(float)
+        export_df.index = pd.to_timedelta(export_df.index.astype(float), unit="h")
+    return export_df
+
+def _to_compact_dtype(values, port_type, float_dtype):
+    """Convert series of port values to the smallest fitting dtype.
+
+    Parameters
+    ----------
+    values : pandas Series
+        Values of a single port.
+    port_type : str or None
+        Data type reported by Lucullus. If None, the dtype is
+        inferred from the values.
+    float_dtype : str
+        Dtype used for floating point values.
+
+    Returns
+    -------
+    values : pandas Series
+        Series with compact dtype.
+    """
+    port_type = str(port_type).lower() if port_type else ""
+    if any(x in port_type for x in ["str", "text", "char"]):
+        return values.astype("category")
+    if "bool" in port_type:
+        return values.astype("boolean")
+
+    non_null = values.dropna()
+    numeric = pd.to_numeric(non_null, errors="coerce")
+    if numeric.isna().any():
+        # Not every value is a number, e.g. timestamps in 'ST_LastUpdate'
+        return values.astype("category")
+    numeric = numeric.astype(float)
+
+    is_integer = "int" in port_type
+    is_switch = not port_type and not numeric.empty and numeric.isin([0, 1]).all()
+    if (is_integer or is_switch) and (numeric == np.round(numeric)).all():
+        int_dtype = "Int64"
+        for dtype in ["Int8", "Int16", "Int32"]:
+            info = np.iinfo(dtype.lower())
+            if numeric.empty or (numeric.min() >= info.min and numeric.max() <= info.max):
+                int_dtype = dtype
+                break
+        return pd.to_numeric(values, errors="coerce").astype(int_dtype)
+    return pd.to_numeric(values, errors="coerce").astype(float_dtype)
+
 def get_running_reactors(auth):
     """Get names and process ids of reactors with status "running".
 
@@ -418,10 +1029,8 @@ def get_running_reactors(auth):
     running_reactors : dict
         Dictionary with running reactors as keys and process IDs as values.
     """
-    response = requests.get(REST_URL+"reactors?running=true", auth=auth, timeout=TIMEOUT)
-    data = response.json()["data"]
     running_reactors = {}
-    for item in data:
+    for item in iter_resources("reactors?running=true", auth):
         running_reactors.update({item["name"]: item["process"]["id"]})
     return running_reactors
 
@@ -438,10 +1047,8 @@ def get_running_processes(auth):
     running_processes : dict
         Dictionary with running reactors as keys and process IDs as values.
     """
-    response = requests.get(REST_URL+"processes?running=true", auth=auth, timeout=TIMEOUT)
-    data = response.json()["data"]
     running_processes = {}
-    for item in data:
+    for item in iter_resources("processes?running=true", auth):
         running_processes.update({item["name"]: item["id"]})
     return running_processes
 
@@ -465,12 +1072,11 @@ def get_process_state(process, auth, verbose=True):
         whether verbose is set to True or False.
     """
     process = get_process_id(process, auth)
-    response = requests.get(REST_URL+f"processes/{process}", auth=auth, timeout=TIMEOUT)
-    process_state = response.json()["data"]["state"]
+    json_data = get_client().get_json(f"processes/{process}", auth)
     if verbose:
-        process_state = response.json()["included"]["processStateCodes"]["name"]
+        process_state = json_data["included"]["processStateCodes"]["name"]
     else:
-        process_state = response.json()["data"]["state"]
+        process_state = json_data["data"]["state"]
     return process_state
 
 def get_current_values(reactor_name, port, auth):
@@ -491,28 +1097,103 @@ def get_current_values(reactor_name, port, auth):
     current_values : dict
         Dictionary with port names and time as "Time [h]".
     """
+    port_id_str = get_port_id_str(port, auth)
+    link = "reactors/"+reactor_name+"?currentValues="+port_id_str
+    current_values = {}
+    try:
+        current_values = parse_current_values(get_client().get_json(link, auth))
+    except requests.HTTPError as err:
+        print("Request failed.", err)
+
+    return current_values
+
+def get_port_id_str(port, auth):
+    """Get comma separated string of port IDs as used by the
+    currentValues query of the reactors endpoint.
+
+    Parameters
+    ----------
+    port : int, str or list of int or list of str
+        Port name or ID or list of names or IDs of several ports.
+    auth : tuple
+        Tuple of username and password.
+
+    Returns
+    -------
+    port_id_str : str
+        Comma separated port IDs.
+    """
     if isinstance(port, list):
         port_id_str = ",".join([str(get_port_id(id, auth)) for id in port])
     else:
         port_id_str = str(get_port_id(port, auth))
-    link = REST_URL+"reactors/"+reactor_name+"?currentValues="+port_id_str
-    response = requests.get(
-        link,
-        auth=auth, timeout=TIMEOUT)
-    current_values = {}
-    if response.status_code == 200:
-        data = response.json()["data"]
-        current_values.update(
-            {"Time [h]": data["process"]["duration"]}
-        )
-        for item in data["process"]["currentValues"]:
-            current_values.update({item["name"]: item["value"]})
-    else:
-        print("Request failed. Status code", response.status_code)
+    return port_id_str
 
+def parse_current_values(json_data):
+    """Get current values from the json response of a reactor.
+
+    Parameters
+    ----------
+    json_data : dict
+        Json response of the reactors endpoint with currentValues.
+
+    Returns
+    -------
+    current_values : dict
+        Dictionary with port names and time as "Time [h]".
+    """
+    data = json_data["data"]
+    current_values = {"Time [h]": data["process"]["duration"]}
+    for item in data["process"]["currentValues"]:
+        current_values.update({item["name"]: item["value"]})
     return current_values
 
-def set_current_values(process, updated_ports, auth):
+def get_fleet_current_values(port, auth, max_workers=8):
+    """Get current values of ports of all running reactors.
+
+    The running reactors and the port IDs are requested once, the
+    current values of the reactors are then requested concurrently
+    over the session of the read client.
+
+    Parameters
+    ----------
+    port : int, str or list of int or list of str
+        Port name or ID or list of names or IDs of several ports.
+    auth : tuple
+        Tuple of username and password.
+    max_workers : int, default=8
+        Maximum number of concurrent requests.
+
+    Returns
+    -------
+    fleet_values : pandas DataFrame
+        Current values with the reactor names as index and the
+        process IDs, time as "Time [h]" and port names as columns.
+        Reactors whose request failed have missing values.
+    """
+    running_reactors = get_running_reactors(auth)
+    port_id_str = get_port_id_str(port, auth)
+
+    client = get_client()
+
+    def get_reactor_values(reactor_name):
+        try:
+            json_data = client.get_json("reactors/"+reactor_name+"?currentValues="+port_id_str, auth)
+        except requests.HTTPError as err:
+            warnings.warn(f"Request for current values of reactor '{reactor_name}' failed. {err}")
+            return {}
+        return parse_current_values(json_data)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        current_values = list(executor.map(get_reactor_values, running_reactors))
+
+    fleet_values = pd.DataFrame(
+        current_values, index=pd.Index(list(running_reactors), name="Reactor")
+    )
+    fleet_values.insert(0, "Process ID", list(running_reactors.values()))
+    return fleet_values
+
+def set_current_values(process, updated_ports, auth, devices=None):
     """Set current port values of process.
 
     Parameters
@@ -524,24 +1205,36 @@ def set_current_values(process, updated_ports, auth):
         the new value to write to this port.
     auth : tuple
         Tuple of username and password.
+    devices : dict, default=None
+        Dictionary with port names as keys and device names as values,
+        in case there are duplicate port names. Ports not in the
+        dictionary are written to their first signal.
 
     Returns
     -------
-    None
+    written_ports : list
+        Names of the ports that were updated successfully.
     """
     process = get_process_id(process, auth)
     port_names = list(updated_ports.keys())
-    signal_info = get_process_signal_info(process, auth)
+    written_ports = []
+    signal_index = get_signal_index(process, auth, ports=port_names)
+    is_refreshed = False
     headers={"Content-Type":"application/json"}
     for port in port_names:
+        device = (devices or {}).get(port)
+        if device is not None and (port, device) not in signal_index.signals and not is_refreshed:
+            # The device may have started logging the port after the
+            # index was built
+            signal_index = get_signal_index(process, auth, refresh=True)
+            is_refreshed = True
         try:
-            signal_id = signal_info[signal_info["portName"] == port]["id"].values[0]
-            link = REST_URL+f"signals/{signal_id}"
-            response = requests.put(
-                link, data=json.dumps({"currentValue": updated_ports[port]}),
-                auth=auth,
-                headers=headers,
-                timeout=TIMEOUT
+            signal_id, _, _ = signal_index.lookup(port, device)
+            link = f"signals/{signal_id}"
+            response = get_client("write").put(
+                link, auth,
+                data=json.dumps({"currentValue": updated_ports[port]}),
+                headers=headers
             )
             if response.status_code != 200:
                 warnings.warn(
@@ -549,10 +1242,13 @@ def set_current_values(process, updated_ports, auth):
                     f" '{port}' was '{response.status_code}'. "
                     f"'{response.text}'"
                 )
-        except IndexError:
+            else:
+                written_ports.append(port)
+        except KeyError:
             warnings.warn(
                 f"Port {port} could not be updated because it does not exist."
             )
+    return written_ports
 
 def get_attributes(process, auth):
     """Get attributes of process.
@@ -571,13 +1267,15 @@ def get_attributes(process, auth):
     """
     process = get_process_id(process, auth)
 
-    response = requests.get(REST_URL + f"processes/{process}", auth=auth, timeout=TIMEOUT)
-    attribute_values = response.json()["data"]["attributes"]
+    attribute_values = get_client().get_json(f"processes/{process}", auth)["data"]["attributes"]
     # When this function was initially created, the author assumed that there would always
     # be a key 'value' where there is a string. However, when an attribute is a vector,
     # there will be 'elements' and it will be a list. At this current time this is
     # inconvenient, so we replace 'elements' with 'value' and make it a string for
     # consistency of this library.
+    # The json response may be shared with concurrent requests (see Client.get_json),
+    # so the attributes are copied before they are modified.
+    attribute_values = [dict(a) for a in attribute_values]
     for a in attribute_values:
         if "elements" in a.keys():
             a["value"] = str(a["elements"])
@@ -590,8 +1288,9 @@ def get_attributes(process, auth):
     )
     attribute_values.set_index("definitionId", drop=True, inplace=True)
 
-    response = requests.get(REST_URL + f"attributedefinitions?processIds={process}", auth=auth, timeout=TIMEOUT)
-    attributes_meta_info = response.json()["data"]
+    attributes_meta_info = get_client().get_json(
+        f"attributedefinitions?processIds={process}", auth
+    )["data"]
     attributes_meta_info = pd.concat(
         [
             pd.DataFrame(a, index=[idx])
@@ -625,15 +1324,17 @@ def set_attributes(process, updated_attributes, auth):
 
     Returns
     -------
-    None
+    written_attributes : list
+        Names of the attributes that were updated successfully, all
+        or none of them.
     """
 
     process = get_process_id(process, auth)
     headers={"Content-Type":"application/json"}
-    response = requests.put(
-        REST_URL + f"processes/{process}/attributes",
+    response = get_client("write").put(
+        f"processes/{process}/attributes", auth,
         data=json.dumps(updated_attributes),
-        auth=auth, headers=headers, timeout=TIMEOUT
+        headers=headers
     )
     if response.status_code != 200:
         warnings.warn(
@@ -641,6 +1342,40 @@ def set_attributes(process, updated_attributes, auth):
             f" '{response.status_code}'."
             f" '{response.text}'"
         )
+        return []
+    return list(updated_attributes)
+
+def parse_media_table(json_medium_data):
+    """Get table of media from the medium of a process.
+
+    Parameters
+    ----------
+    json_medium_data : dict
+        Medium from the json response of a process.
+
+    Returns
+    -------
+    media_table : pandas DataFrame
+        Table containing information on recipes, lots, amounts etc.
+    """
+    columns = [
+        "recipe_id", "recipe_name", "lot_id", "lot_name",
+        "lot_productionDate", "planned", "amount"
+    ]
+    records = []
+    for feed in json_medium_data["feeds"]:
+        lot = feed.get("lot", {})
+        records.append((
+            feed["recipe"]["id"],
+            feed["recipe"]["name"],
+            lot.get("id"),
+            lot.get("name"),
+            lot.get("productionDate"),
+            feed["planned"],
+            feed["amount"],
+        ))
+    media_table = pd.DataFrame.from_records(records, columns=columns)
+    return media_table
 
 def get_media_table(process, auth):
     """Get table of media of process.
@@ -658,36 +1393,60 @@ def get_media_table(process, auth):
         Table containing information on recipes, lots, amounts etc.
     """
     process = get_process_id(process, auth)
-    response = requests.get(REST_URL + f"processes/{process}", auth=auth, timeout=TIMEOUT)
-    json_medium_data = response.json()["data"]["medium"]
-
-    # index = list(json_medium_data.keys())
-
-    recipe_id = [x["recipe"]["id"] for x in json_medium_data["feeds"]]
-    recipe_name = [x["recipe"]["name"] for x in json_medium_data["feeds"]]
-    lot_id = [x["lot"]["id"] if "lot" in x.keys() else None for x in json_medium_data["feeds"]]
-    lot_name = [x["lot"]["name"] if "lot" in x.keys() else None for x in json_medium_data["feeds"]]
-    lot_production_date = [
-        x["lot"]["productionDate"]
-        if "productionDate" in x.keys()
-        else None
-        for x in json_medium_data["feeds"]
-    ]
-    planned = [x["planned"] for x in json_medium_data["feeds"]]
-    amount = [x["amount"] for x in json_medium_data["feeds"]]
-
-    media_table = pd.DataFrame(
-        # index=index,
-        data={
-            "recipe_id":recipe_id,
-            "recipe_name":recipe_name,
-            "lot_id":lot_id,
-            "lot_name":lot_name,
-            "lot_productionDate":lot_production_date,
-            "planned":planned,
-            "amount":amount}
-    )
-    return media_table
+    json_medium_data = get_client().get_json(f"processes/{process}", auth)["data"]["medium"]
+    return parse_media_table(json_medium_data)
+
+def get_media_tables(processes, auth, max_workers=8):
+    """Get tables of media of several processes at once.
+
+    The processes are requested concurrently over the session of the
+    read client.
+
+    Parameters
+    ----------
+    processes : list of int or list of str
+        Process names or IDs.
+    auth : tuple
+        Tuple of username and password.
+    max_workers : int, default=8
+        Maximum number of concurrent requests.
+
+    Returns
+    -------
+    media_tables : pandas DataFrame
+        Media tables (see get_media_table) of all processes, with the
+        processes as given as first index level "Process". Processes
+        whose request failed are missing.
+    """
+    return _get_tables(get_media_table, processes, auth, "Process", max_workers)
+
+def parse_recipe_table(json_data):
+    """Get recipe table from the json response of a recipe.
+
+    Parameters
+    ----------
+    json_data : dict
+        Json response of a recipe.
+
+    Returns
+    -------
+    recipe_table : pandas dataframe
+        Recipe table showing actions and materials of recipe.
+    """
+    included = json_data["included"]
+    lookups = {
+        "ingredient": ("ingredientId", {i["id"]: i["name"] for i in included["ingredients"]}),
+        "unit": ("unitId", {i["id"]: i["symbol"] for i in included["units"]}),
+        "action": ("actionId", {i["id"]: i["name"] for i in included["actions"]}),
+    }
+
+    recipe_table = pd.DataFrame.from_records(json_data["data"]["steps"])
+    for column, (id_column, lookup) in lookups.items():
+        if id_column in recipe_table:
+            recipe_table[column] = recipe_table[id_column].map(lookup).fillna("")
+        else:
+            recipe_table[column] = ""
+    return recipe_table
 
 def get_recipe_table(recipe, auth):
     """Get table for a specific recipe containing ingrediants, actions, etc.
@@ -705,37 +1464,52 @@ def get_recipe_table(recipe, auth):
         Recipe table showing actions and materials of recipe.
     """
 
-    link = REST_URL+"recipes/"+str(recipe)
-    response = requests.get(link, auth=auth, timeout=TIMEOUT)
-    json_data = response.json()
-
-    action_dict = {}
-    for i in json_data["included"]["actions"]:
-        action_dict.update({i["id"]:i["name"]})
-    ingredient_dict = {np.nan:""}
-    for i in json_data["included"]["ingredients"]:
-        ingredient_dict.update({i["id"]:i["name"]})
-    unit_dict = {np.nan:""}
-    for i in json_data["included"]["units"]:
-        unit_dict.update({i["id"]:i["symbol"]})
-
-    recipe_table = dictionaries_to_df(json_data["data"]["steps"])
-    recipe_table["ingredient"] = [
-        "" if np.isnan(i)
-        else ingredient_dict[i]
-        for i in recipe_table["ingredientId"]
-    ]
-    recipe_table["unit"] = [
-        "" if np.isnan(i)
-        else unit_dict[i]
-        for i in recipe_table["unitId"]
-    ]
-    recipe_table["action"] = [
-        "" if np.isnan(i)
-        else action_dict[i]
-        for i in recipe_table["actionId"]
-    ]
-    return recipe_table
+    link = "recipes/"+str(recipe)
+    json_data = get_client().get_json(link, auth)
+    return parse_recipe_table(json_data)
+
+def get_recipe_tables(recipes, auth, max_workers=8):
+    """Get tables of several recipes at once.
+
+    Every recipe is requested once, concurrently over the session of
+    the read client.
+
+    Parameters
+    ----------
+    recipes : list of str or list of int
+        Recipe names or IDs, duplicates are requested once.
+    auth : tuple
+        Tuple of username and password.
+    max_workers : int, default=8
+        Maximum number of concurrent requests.
+
+    Returns
+    -------
+    recipe_tables : pandas DataFrame
+        Recipe tables (see get_recipe_table) of all recipes, with the
+        recipes as given as first index level "Recipe". Recipes whose
+        request failed are missing.
+    """
+    return _get_tables(get_recipe_table, recipes, auth, "Recipe", max_workers)
+
+def _get_tables(get_table, keys, auth, name, max_workers):
+    """Call get_table concurrently for unique keys and concatenate
+    the tables with the keys as first index level."""
+    keys = list(dict.fromkeys(keys))
+
+    def get_key_table(key):
+        try:
+            return get_table(key, auth)
+        except (requests.HTTPError, KeyError, IndexError) as err:
+            warnings.warn(f"Request for {name.lower()} '{key}' failed. {err}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        tables = dict(zip(keys, executor.map(get_key_table, keys)))
+    tables = {key: table for key, table in tables.items() if table is not None}
+    if not tables:
+        return pd.DataFrame()
+    return pd.concat(tables, names=[name, None])
 
 def get_process_attributes(process, auth):
     """Get dictionary of attributes of specified process.
@@ -753,8 +1527,7 @@ def get_process_attributes(process, auth):
         Process attributes together with their values.
     """
     process = get_process_id(process, auth)
-    response = requests.get(REST_URL + f"processes/{process}", auth=auth, timeout=TIMEOUT)
-    json_data = response.json()
+    json_data = get_client().get_json(f"processes/{process}", auth)
     process_attributes = {}
     for attribute_val in json_data["data"]["attributes"]:
         key = [
@@ -768,6 +1541,30 @@ def get_process_attributes(process, auth):
         )
     return process_attributes
 
+def _is_unchanged(value, last_value, deadband, name):
+    """Return True if value equals last_value, or for numbers if it
+    is within the deadband of name."""
+    if isinstance(deadband, dict):
+        deadband = deadband.get(name)
+    if (
+        deadband is not None
+        and isinstance(value, (int, float, np.number))
+        and isinstance(last_value, (int, float, np.number))
+        and not isinstance(value, bool)
+    ):
+        return abs(value - last_value) <= deadband
+    try:
+        return bool(value == last_value)
+    except (TypeError, ValueError):
+        return False
+
+def _write_pickle(data, file_path):
+    """Write data as gzip compressed pickle, replacing file_path
+    atomically."""
+    temp_path = file_path + ".tmp"
+    pd.to_pickle(data, temp_path, compression={"method": "gzip", "compresslevel": 1})
+    os.replace(temp_path, file_path)
+
 class Controller:
     """Class controller that periodically
         1. collects data over Lucullus REST-API,
@@ -809,6 +1606,87 @@ class Controller:
         save_path :  string or None, default None
             Path where output should be stored as csv. If None,
             will not save as csv.
+        historic_processes : list or str, default None
+            Processes whose data is put in front of the collected
+            data.
+        historic_loading : {"eager", "background"}, default "eager"
+            If "eager", the historic processes are exported while
+            the controller is initialized. If "background", the
+            export runs in the background and collect_data waits for
+            it only after the live data is collected.
+        historic_workers : int, default 4
+            Number of historic processes exported concurrently.
+        max_rows : int or None, default None
+            Maximum number of rows of live data kept in
+            collected_data. If max_rows or max_age is set, the live
+            data is kept in a RingBuffer, so memory stays bounded for
+            long running controllers. The historic data is always
+            kept completely.
+        max_age : float or None, default None
+            Maximum age in seconds of live data kept in
+            collected_data, relative to the newest row.
+        pipelined : bool, default False
+            If True, independent steps of the update cycle run
+            concurrently and calculated data is saved in the
+            background (see update).
+        write_changes_only : bool, default False
+            If True, ports and attributes are only written if their
+            value changed since it was last written by the
+            controller. 'ST_LastUpdate' and 'ST_NextUpdate' are
+            always written.
+        deadband : float or dict or None, default None
+            Numeric port values within the deadband of the last
+            written value count as unchanged. Either one deadband
+            for all ports or a dictionary with port names as keys.
+            Only used if write_changes_only is True.
+        refresh_interval : float or None, default None
+            Interval in seconds after which unchanged values are
+            written again anyway. If None, unchanged values are
+            never written again. Only used if write_changes_only is
+            True.
+        calc_pool : int or concurrent.futures.Executor or None, default None
+            If set, calc_fun and output_fun run in worker processes,
+            so CPU-bound calculations do not block the controller.
+            Either the number of worker processes, or an executor,
+            e.g. a ProcessPoolExecutor shared by several controllers.
+            The float columns of collected_data are handed to the
+            workers over shared memory (see SharedFrame), calc_fun
+            and output_fun must be picklable, e.g. defined at module
+            level.
+        calc_timeout : float or None, default None
+            Seconds to wait for calc_fun and output_fun in calc_pool.
+            After the timeout the cycle continues with the last
+            calculated data and without updating the output ports,
+            the result is picked up in a later cycle. If None, waits
+            until they are done.
+        min_interval : float or None, default None
+            Lower bound of the adaptive update interval in seconds.
+            If min_interval or max_interval is set, the interval
+            between two updates adapts to the process dynamics and
+            the duration of the updates (see adapt_interval), starting
+            from update_interval. Unset bounds default to
+            update_interval.
+        max_interval : float or None, default None
+            Upper bound of the adaptive update interval in seconds.
+        change_threshold : float, default 0.5
+            Change of the collected ports per update, in standard
+            deviations of the port, above which the adaptive update
+            interval is shortened.
+        current_interval : float
+            Interval in seconds until the next update, equal to
+            update_interval unless the interval is adaptive.
+        checkpoint_path : str or None, default None
+            Path of a file where the state of the controller is saved
+            after every update (see save_checkpoint), the historic
+            data is saved once next to it. If the files
+            exist when the controller is initialized, the state is
+            restored from it instead of exporting the historic
+            processes again. If None, no checkpoints are saved.
+        devices : list of str or dict, default None
+            Devices of the ports, in case there are duplicate port
+            names (see get_signals). Used for collecting the live and
+            historic data, and for updating ports if it is a
+            dictionary.
         collected_data : pd.DataFrame
             Data that is collected from process.
         attributes : dictionary
@@ -832,7 +1710,11 @@ class Controller:
     def __init__(self, process, ports, auth,
             calc_fun=None, output_fun=None, output_attr_fun=None, end_condition=None,
             interp_interval=0, update_interval=300, save_path=None,
-            print_progress=True, overwrite=False, historic_processes=None, devices=None):
+            print_progress=True, overwrite=False, historic_processes=None, devices=None,
+            historic_loading="eager", historic_workers=4, max_rows=None, max_age=None,
+            pipelined=False, write_changes_only=False, deadband=None, refresh_interval=None,
+            calc_pool=None, calc_timeout=None, checkpoint_path=None,
+            min_interval=None, max_interval=None, change_threshold=0.5):
         """Initialize the Controller class."""
 
         self.devices = devices
@@ -856,16 +1738,61 @@ class Controller:
 
         self.interp_interval = interp_interval
         self.update_interval = update_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.change_threshold = change_threshold
+        self.current_interval = update_interval
+        self._last_values = None
+        self._cycle_duration = 0
 
         self.collected_data = pd.DataFrame()
         self.calculated_data = pd.DataFrame()
+        self._live_data = pd.DataFrame()
+        if max_rows is None and max_age is None:
+            self._buffer = None
+        else:
+            self._buffer = RingBuffer(max_rows=max_rows, max_age=max_age)
         self.attributes = {}
         self.overwrite = overwrite
         self._create_save_path(save_path)
         self.print_progress = print_progress
 
+        if historic_loading not in ["eager", "background"]:
+            raise ValueError(
+                f"Unknown historic_loading '{historic_loading}', use 'eager' or 'background'."
+            )
+        self.historic_workers = historic_workers
+        self.pipelined = pipelined
+        self._io_executor = ThreadPoolExecutor(max_workers=2) if pipelined else None
+        self._save_executor = ThreadPoolExecutor(max_workers=1) if pipelined else None
+        self._save_lock = threading.Lock()
+        self._save_queue = None
+        self._save_running = False
+        self._save_future = None
+        self.write_changes_only = write_changes_only
+        self.deadband = deadband
+        self.refresh_interval = refresh_interval
+        self._written_ports = {}
+        self._written_attributes = {}
+        if isinstance(calc_pool, Executor):
+            self._calc_pool = calc_pool
+            self._owns_calc_pool = False
+        elif calc_pool:
+            self._calc_pool = ProcessPoolExecutor(max_workers=calc_pool)
+            self._owns_calc_pool = True
+        else:
+            self._calc_pool = None
+            self._owns_calc_pool = False
+        self.calc_timeout = calc_timeout
+        self._pool_futures = {}
         self._historic_processes = historic_processes
-        self._collect_historic_data()
+        self._historic_futures = None
+        self.checkpoint_path = checkpoint_path
+        self._checkpointed_historic_data = None
+        if not self.load_checkpoint():
+            self._collect_historic_data()
+            if historic_loading == "eager":
+                _ = self.historic_data
 
     def _process_is_running(self):
         """Return true if process is running.
@@ -880,17 +1807,44 @@ class Controller:
         return is_running
 
     def _collect_historic_data(self):
-        historic_data = []
+        """Start exporting the historic processes concurrently, the
+        result is available as historic_data."""
+
         if isinstance(self._historic_processes, list):
-            for process in self._historic_processes:
-                historic_data.append(export_to_df(process, self.ports, self.auth))
+            processes = self._historic_processes
         elif isinstance(self._historic_processes, str):
-            historic_data.append(export_to_df(self._historic_processes, self.ports, self.auth))
-
-        if not historic_data:
-            self._historic_data = pd.DataFrame()
+            processes = [self._historic_processes]
         else:
-            self._historic_data = pd.concat(historic_data, axis=0)
+            processes = []
+
+        self._historic_data = pd.DataFrame()
+        if processes:
+            executor = ThreadPoolExecutor(max_workers=self.historic_workers)
+            self._historic_futures = {
+                process: executor.submit(
+                    export_to_df, process, self.ports, self.auth, devices=self.devices
+                )
+                for process in processes
+            }
+            executor.shutdown(wait=False)
+
+    @property
+    def historic_data(self):
+        """Data of the historic processes, waits until all historic
+        processes are exported. Historic processes whose export failed
+        are left out with a warning."""
+
+        if self._historic_futures is not None:
+            historic_data = []
+            for process, future in self._historic_futures.items():
+                try:
+                    historic_data.append(future.result())
+                except Exception as err:
+                    warnings.warn(f"Export of historic process '{process}' failed and is left out. {err}")
+            self._historic_futures = None
+            if historic_data:
+                self._historic_data = pd.concat(historic_data, axis=0)
+        return self._historic_data
 
     def _create_save_path(self, save_path):
 
@@ -913,20 +1867,81 @@ class Controller:
         else:
             self.save_path = None
 
+    def adapt_interval(self, cycle_duration):
+        """Adapt current_interval to the process dynamics and the
+        duration of the last update, if min_interval or max_interval
+        is set.
+
+        The interval is halved if a collected port changed by more
+        than change_threshold standard deviations since the last
+        update, and increased by half if all ports changed by less
+        than a quarter of it. It is kept at least twice the duration
+        of the last update, so slow responses of the server do not
+        make updates overrun, and within min_interval and
+        max_interval.
+
+        Called by update before the ports are written, so
+        'ST_NextUpdate' reports the adapted interval.
+
+        Parameters
+        ----------
+        cycle_duration : float
+            Duration of the last update in seconds.
+
+        Returns
+        -------
+        current_interval : float
+            Interval in seconds until the next update.
+        """
+
+        if self.min_interval is None and self.max_interval is None:
+            return self.current_interval
+        min_interval = self.min_interval if self.min_interval is not None else self.update_interval
+        max_interval = self.max_interval if self.max_interval is not None else self.update_interval
+
+        change = self._change_rate()
+        interval = self.current_interval
+        if change is not None and change > self.change_threshold:
+            interval /= 2
+        elif change is not None and change < self.change_threshold / 4:
+            interval *= 1.5
+        interval = max(interval, 2 * cycle_duration)
+        self.current_interval = min(max(interval, min_interval), max_interval)
+        return self.current_interval
+
+    def _change_rate(self):
+        """Get the largest change of the last values of the numeric
+        ports of the live data since the last call, in standard
+        deviations of the port. None
+        if there is nothing to compare yet."""
+
+        numeric_data = self._live_data.select_dtypes("number")
+        if numeric_data.empty:
+            return None
+        # Ports are logged on their own timestamps, so the last row
+        # mostly has missing values
+        last_values = numeric_data.ffill().iloc[-1]
+        previous_values, self._last_values = self._last_values, last_values
+        if previous_values is None:
+            return None
+        scale = numeric_data.std().replace(0, np.nan)
+        change = ((last_values - previous_values).abs() / scale).max()
+        return None if pd.isna(change) else float(change)
+
     def start_update_cycle(self):
         """Continually perform update in the intervall defined in unpdate_interval."""
 
-        time_delta = timedelta(seconds=self.update_interval)
-
         continue_process = self.end_condition(self.collected_data, self.calculated_data)
         while continue_process and self._process_is_running():
             start_time = datetime.now(timezone.utc)
             self.update()
             end_time = datetime.now(timezone.utc)
-            sleep_time = start_time + time_delta - end_time
+            self._cycle_duration = (end_time - start_time).total_seconds()
+            sleep_time = start_time + timedelta(seconds=self.current_interval) - end_time
             if sleep_time.total_seconds() > 0:
                 time.sleep(sleep_time.total_seconds())
 
+        self.wait_for_saving()
         if self.print_progress:
             print("Stop critera is met. Stopping update cycle.")
 
@@ -935,23 +1950,124 @@ class Controller:
             * self.collect_data()
             * self.collect_attributes()
             * self.update_calculations()
+            * self.adapt_interval()
             * self.update_ports()
             * self.update_attributes()
+            * self.save_data()
+
+        followed by self.save_checkpoint().
+
+        If pipelined is True, collect_data and collect_attributes run
+        concurrently, then update_ports and update_attributes run
+        concurrently, and save_data and save_checkpoint run in the
+        background.
         """
 
         try:
-            self.collect_data()
-            self.collect_attributes()
-            self.update_calculations()
-            self.update_ports()
-            self.update_attributes()
-            self.save_data()
+            if self.pipelined:
+                self._update_pipelined()
+            else:
+                self.collect_data()
+                self.collect_attributes()
+                self.update_calculations()
+                self.adapt_interval(self._cycle_duration)
+                self.update_ports()
+                self.update_attributes()
+                self.save_data()
+                self.save_checkpoint()
         except Exception:
             traceback.print_exc()
             warnings.warn(
                 f"{datetime.now()}: Continue update cycle..."
             )
 
+    def _update_pipelined(self):
+        """Update a single time with independent steps running
+        concurrently."""
+
+        reads = [
+            self._io_executor.submit(self.collect_data),
+            self._io_executor.submit(self.collect_attributes),
+        ]
+        for future in reads:
+            future.result()
+
+        self.update_calculations()
+        self.adapt_interval(self._cycle_duration)
+
+        writes = [
+            self._io_executor.submit(self.update_ports),
+            self._io_executor.submit(self.update_attributes),
+        ]
+        for future in writes:
+            future.result()
+        self._save_in_background()
+
+    def _save_in_background(self):
+        """Queue calculated_data and the checkpoint for saving by the
+        background writer. If the writer is still busy, only the newest
+        data is saved."""
+
+        if not self.save_path and not self.checkpoint_path:
+            return
+        # calc_fun of the next cycle may change calculated_data in place
+        # while it is written
+        calculated_data = self.calculated_data.copy()
+        checkpoint = self._checkpoint_state() if self.checkpoint_path else None
+        if checkpoint is not None:
+            checkpoint["calculated_data"] = calculated_data
+        item = {
+            "calculated_data": calculated_data if self.save_path else None,
+            "checkpoint": checkpoint,
+        }
+        with self._save_lock:
+            previous = self._save_queue
+            if previous is not None and previous["checkpoint"] is not None:
+                # Historic data that was not written yet must not be dropped
+                if "historic_data" in previous["checkpoint"]:
+                    item["checkpoint"].setdefault(
+                        "historic_data", previous["checkpoint"]["historic_data"]
+                    )
+            self._save_queue = item
+            if not self._save_running:
+                self._save_running = True
+                self._save_future = self._save_executor.submit(self._save_queued_data)
+
+    def _save_queued_data(self):
+        is_running = True
+        try:
+            while True:
+                with self._save_lock:
+                    item = self._save_queue
+                    self._save_queue = None
+                    if item is None:
+                        self._save_running = is_running = False
+                        return
+                if item["calculated_data"] is not None:
+                    try:
+                        self._save_calculated_data(item["calculated_data"])
+                    except Exception as err:
+                        warnings.warn(f"Calculated data could not be saved. {err}")
+                if item["checkpoint"] is not None:
+                    try:
+                        self._write_checkpoint(item["checkpoint"])
+                    except Exception as err:
+                        warnings.warn(f"Checkpoint could not be saved. {err}")
+        finally:
+            if is_running:
+                # The next queued data starts a new writer
+                with self._save_lock:
+                    self._save_running = False
+
+    def wait_for_saving(self):
+        """Wait until the background writer saved the newest data, if
+        pipelined is True."""
+
+        with self._save_lock:
+            future = self._save_future
+        if future is not None:
+            future.result()
+
     def collect_data(self):
         """Collect data specified by process and ports and write
         them to collected_data as a pandas dataframe."""
@@ -966,7 +2082,11 @@ class Controller:
                 devices=self.devices
             )
 
-            self.collected_data = pd.concat([self._historic_data, collected_data], axis=0)
+            if self._buffer is not None:
+                self._buffer.append(collected_data)
+                collected_data = self._buffer.to_frame()
+            self._live_data = collected_data
+            self.collected_data = pd.concat([self.historic_data, collected_data], axis=0)
 
     def collect_attributes(self):
         """Collect attributes of process."""
@@ -975,13 +2095,75 @@ class Controller:
     def update_calculations(self):
         """Perform calculations by calling the function stored in calc_fun."""
 
-        if self.calc_fun:
+        if self.calc_fun and self._calc_pool is not None:
+            self.calculated_data = self._call_in_pool(
+                "calc_fun", self.calc_fun, self.calculated_data
+            )
+        elif self.calc_fun:
             self.calculated_data = self.calc_fun(
                 self.collected_data,
                 self.calculated_data,
                 self.attributes
             )
 
+    def _call_in_pool(self, key, fun, default):
+        """Call fun with collected data, calculated data and attributes
+        in calc_pool.
+
+        If a previous call of fun timed out and is still running, its
+        result is awaited instead of starting a new call.
+
+        Parameters
+        ----------
+        key : str
+            Name of the call.
+        fun : function
+            Function to call.
+        default
+            Returned if the call does not finish within calc_timeout.
+
+        Returns
+        -------
+        result
+            Return value of fun or default.
+        """
+        future = self._pool_futures.get(key)
+        if future is None:
+            shared = SharedFrame(self.collected_data)
+            try:
+                future = self._calc_pool.submit(
+                    call_with_frame, fun, shared.descriptor,
+                    self.calculated_data, self.attributes
+                )
+            except Exception:
+                shared.unlink()
+                raise
+            future.add_done_callback(lambda _: shared.unlink())
+            self._pool_futures[key] = future
+
+        try:
+            return future.result(timeout=self.calc_timeout)
+        except FuturesTimeoutError:
+            warnings.warn(
+                f"{key} did not finish within {self.calc_timeout} s,"
+                " continuing with the last result."
+            )
+            return default
+        finally:
+            if future.done():
+                self._pool_futures.pop(key, None)
+
+    def close(self):
+        """Shut down the worker threads and processes of the
+        controller, after pending data is saved."""
+
+        self.wait_for_saving()
+        for executor in [self._io_executor, self._save_executor]:
+            if executor is not None:
+                executor.shutdown()
+        if self._owns_calc_pool:
+            self._calc_pool.shutdown(cancel_futures=True)
+
     def update_ports(self):
         """Update ports based on collected data, attributes, and calculated data by calling
         output_fun and then update the ports defined in the output."""
@@ -989,7 +2171,9 @@ class Controller:
         now = datetime.now()
         ports_to_update = {}
 
-        if self.output_fun:
+        if self.output_fun and self._calc_pool is not None:
+            ports_to_update.update(self._call_in_pool("output_fun", self.output_fun, {}))
+        elif self.output_fun:
             ports_to_update.update(self.output_fun(
                 self.collected_data,
                 self.calculated_data,
@@ -999,16 +2183,24 @@ class Controller:
         if self.print_progress:
             print(now, ports_to_update)
 
+        if self.write_changes_only:
+            ports_to_update = self._filter_changed(
+                ports_to_update, self._written_ports, now, self.deadband
+            )
+
         ports_to_update.update({
             "ST_LastUpdate": str(now),
-            "ST_NextUpdate": str(now + timedelta(seconds=self.update_interval))
+            "ST_NextUpdate": str(now + timedelta(seconds=self.current_interval))
         })
 
-        set_current_values(
+        written_ports = set_current_values(
             self.process,
             ports_to_update,
-            self.auth
+            self.auth,
+            devices=self.devices if isinstance(self.devices, dict) else None
         )
+        if self.write_changes_only:
+            self._record_written(ports_to_update, written_ports, self._written_ports, now)
 
     def update_attributes(self):
         """Update attributes based on collected data, attributes, and calculated data by calling
@@ -1024,24 +2216,197 @@ class Controller:
             if self.print_progress:
                 print(datetime.now(), attributes_to_update)
 
-            set_attributes(
+            now = datetime.now()
+            if self.write_changes_only:
+                attributes_to_update = self._filter_changed(
+                    attributes_to_update, self._written_attributes, now
+                )
+                if not attributes_to_update:
+                    return
+
+            written_attributes = set_attributes(
                 self.process,
                 attributes_to_update,
                 self.auth
             )
+            if self.write_changes_only:
+                self._record_written(
+                    attributes_to_update, written_attributes, self._written_attributes, now
+                )
+
+    def _filter_changed(self, values, written, now, deadband=None):
+        """Return the values that changed since they were last
+        written (see _record_written).
+
+        Parameters
+        ----------
+        values : dict
+            Names and values to write.
+        written : dict
+            Names and tuples of last written value and time.
+        now : datetime
+            Time of writing.
+        deadband : float or dict or None, default None
+            Deadband for numeric values, see Controller.
+
+        Returns
+        -------
+        changed : dict
+            Names and values that need to be written.
+        """
+        changed = {}
+        for name, value in values.items():
+            if name in written:
+                last_value, last_time = written[name]
+                refresh = (
+                    self.refresh_interval is not None
+                    and (now - last_time).total_seconds() >= self.refresh_interval
+                )
+                if not refresh and _is_unchanged(value, last_value, deadband, name):
+                    continue
+            changed[name] = value
+        return changed
+
+    @staticmethod
+    def _record_written(values, names, written, now):
+        """Remember the values of names as written at now, values
+        that failed to be written are not remembered so they are
+        written again in the next update."""
+        for name in names:
+            written[name] = (values[name], now)
+
+    def reset_written_values(self):
+        """Forget the last written values, so all ports and attributes
+        are written in the next update if write_changes_only is
+        True."""
+
+        self._written_ports.clear()
+        self._written_attributes.clear()
+
+    def save_checkpoint(self):
+        """Save the state of the controller to checkpoint_path, so a
+        restarted controller can resume with load_checkpoint.
+
+        The state consists of the live data, calculated data,
+        attributes and last written values. It is saved as a gzip
+        compressed pickle, the file is replaced atomically. The
+        historic data does not change and is only saved once, to
+        checkpoint_path with the suffix '.historic'.
+        """
+
+        if not self.checkpoint_path:
+            return
+        self._write_checkpoint(self._checkpoint_state())
+
+    def _checkpoint_state(self):
+        """Get the state of the controller, with the historic data only
+        if it was not saved yet."""
+
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "process": self.process,
+            "ports": list(self.ports),
+            "historic_processes": self._historic_processes,
+            "live_data": self._live_data,
+            "calculated_data": self.calculated_data,
+            "attributes": dict(self.attributes),
+            "written_ports": dict(self._written_ports),
+            "written_attributes": dict(self._written_attributes),
+            "saved": datetime.now(timezone.utc),
+        }
+        historic_data = self.historic_data
+        if historic_data is not self._checkpointed_historic_data:
+            state["historic_data"] = historic_data
+        return state
+
+    def _write_checkpoint(self, state):
+        state = dict(state)
+        historic_data = state.pop("historic_data", None)
+        if historic_data is not None:
+            _write_pickle(
+                {
+                    "version": CHECKPOINT_VERSION,
+                    "process": self.process,
+                    "historic_processes": self._historic_processes,
+                    "historic_data": historic_data,
+                },
+                self.checkpoint_path + ".historic"
+            )
+            self._checkpointed_historic_data = historic_data
+        _write_pickle(state, self.checkpoint_path)
+
+    def load_checkpoint(self):
+        """Restore the state of the controller from checkpoint_path.
+
+        The checkpoint is only used if it was saved for the same
+        process, ports and historic processes. Only load checkpoints
+        from trusted sources, as they are pickle files.
+
+        Returns
+        -------
+        loaded : bool
+            True if the state was restored.
+        """
+
+        historic_path = f"{self.checkpoint_path}.historic"
+        if (
+            not self.checkpoint_path
+            or not os.path.exists(self.checkpoint_path)
+            or not os.path.exists(historic_path)
+        ):
+            return False
+        try:
+            state = pd.read_pickle(self.checkpoint_path, compression="gzip")
+            historic_state = pd.read_pickle(historic_path, compression="gzip")
+        except Exception as err:
+            warnings.warn(f"Checkpoint '{self.checkpoint_path}' could not be loaded. {err}")
+            return False
+        if (
+            state.get("version") != CHECKPOINT_VERSION
+            or historic_state.get("version") != CHECKPOINT_VERSION
+            or state["process"] != self.process
+            or historic_state["process"] != self.process
+            or state["ports"] != list(self.ports)
+            or state["historic_processes"] != self._historic_processes
+            or historic_state["historic_processes"] != self._historic_processes
+        ):
+            warnings.warn(
+                f"Checkpoint '{self.checkpoint_path}' was saved for another"
+                " controller configuration and is ignored."
+            )
+            return False
+
+        self._historic_futures = None
+        self._historic_data = historic_state["historic_data"]
+        self._checkpointed_historic_data = self._historic_data
+        self._live_data = state["live_data"]
+        if self._buffer is not None and not self._live_data.empty:
+            self._buffer.append(self._live_data)
+            self._live_data = self._buffer.to_frame()
+        self.collected_data = pd.concat([self._historic_data, self._live_data], axis=0)
+        self.calculated_data = state["calculated_data"]
+        self.attributes = state["attributes"]
+        self._written_ports.update(state["written_ports"])
+        self._written_attributes.update(state["written_attributes"])
+        if self.print_progress:
+            print(f"Restored checkpoint from {state['saved']}.")
+        return True
 
     def save_data(self):
         """Save data as csv-file under path specified in
         save_path attribute."""
 
         if self.save_path:
-            try:
-                self.calculated_data.to_csv(
-                    self.save_path,
-                    index=True
-                )
-            except (OSError, ValueError) as err:
-                print(err)
+            self._save_calculated_data(self.calculated_data)
+
+    def _save_calculated_data(self, calculated_data):
+        try:
+            calculated_data.to_csv(
+                self.save_path,
+                index=True
+            )
+        except (OSError, ValueError) as err:
+            print(err)
 
     def simulate_performance(self, collected_data):
         """Simulate the response of the controller from simulated
@@ -0,0 +1,223 @@
+# MIT License
+# Copyright \(c\) 2023-2024 ZHAW (Institute of Embedded Systems at Zurich University of Applied Sciences) & Securecell AG
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# https://mit-license.org/
+
+"""Breakdown of time and memory of exports by stage and port."""
+
+import contextlib
+import importlib
+import json
+import platform
+import threading
+import time
+import tracemalloc
+from lucullus_rest import client
+from lucullus_rest.utils import LazyModule
+
+pd = LazyModule("pandas")
+
+class Profile:
+    """Record of the wall time and peak memory of the stages of an
+    export, e.g. name resolution, HTTP requests, JSON decoding and
+    DataFrame assembly, optionally per port.
+
+    Pass a profile to export_to_df, get_signals or get_df_from_json
+    with the profile parameter. Time of nested stages is only counted
+    for the innermost stage, e.g. JSON decoding is not part of the
+    HTTP stage. Memory is measured with tracemalloc while the profile
+    is used as context manager, it is the peak of Python allocations
+    during the stage above the memory at its start. As tracemalloc is
+    global, memory of other threads is included.
+
+    Attributes
+    ----------
+    records : list of dict
+        One record per stage with "stage", "port", "time [s]" and
+        "peak_memory [MB]".
+
+    Examples
+    --------
+    >>> with Profile() as profile:
+    ...     df = export_to_df("Process_1", ["PV_pO2", "PV_Temp"], auth, profile=profile)
+    >>> print(profile.report())
+    >>> profile.to_json("export_profile.json")
+    """
+
+    def __init__(self):
+        """Initialize the Profile class."""
+
+        self.records = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracemalloc = False
+
+    def __enter__(self):
+        # numpy and pandas are imported lazily, their import is not
+        # charged to the first stage that uses them
+        importlib.import_module("numpy")
+        importlib.import_module("pandas")
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    @contextlib.contextmanager
+    def stage(self, name, port=None):
+        """Context manager that records a stage.
+
+        Parameters
+        ----------
+        name : str
+            Name of stage.
+        port : str, default=None
+            Port the stage belongs to. If None, the port of the
+            enclosing stage.
+        """
+        stack = self._local.__dict__.setdefault("stack", [])
+        if port is None and stack:
+            port = stack[-1]["port"]
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+        else:
+            current = 0
+        frame = {"children": 0.0, "start_memory": current, "peak": current, "port": port}
+        stack.append(frame)
+
+        previous_profile = getattr(client._profiling, "profile", None)
+        client._profiling.profile = self
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_time
+            client._profiling.profile = previous_profile
+            stack.pop()
+            peak_memory = None
+            if tracing and tracemalloc.is_tracing():
+                peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+                peak_memory = (peak - frame["start_memory"]) / 1e6
+                if stack:
+                    stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+                tracemalloc.reset_peak()
+            if stack:
+                stack[-1]["children"] += elapsed
+            with self._lock:
+                self.records.append({
+                    "stage": name,
+                    "port": port,
+                    "time [s]": elapsed - frame["children"],
+                    "peak_memory [MB]": peak_memory,
+                })
+
+    def to_frame(self, by_port=False):
+        """Summarize the records.
+
+        Parameters
+        ----------
+        by_port : bool, default=False
+            If True, stages are broken down per port.
+
+        Returns
+        -------
+        summary : pandas DataFrame
+            Number of calls, total time and maximum peak memory per
+            stage, in the order the stages first occurred.
+        """
+        records = pd.DataFrame(
+            self.records, columns=["stage", "port", "time [s]", "peak_memory [MB]"]
+        )
+        keys = ["stage", "port"] if by_port else ["stage"]
+        records["port"] = records["port"].fillna("")
+        summary = records.groupby(keys, sort=False).agg(
+            calls=("time [s]", "size"),
+            **{
+                "time [s]": ("time [s]", "sum"),
+                "peak_memory [MB]": ("peak_memory [MB]", "max"),
+            }
+        )
+        return summary
+
+    def report(self, by_port=False):
+        """Get summary of the records as text, see to_frame."""
+        summary = self.to_frame(by_port=by_port)
+        total_time = summary["time [s]"].sum()
+        return f"{summary.to_string()}\nTotal time [s]: {total_time:.4f}"
+
+    def to_json(self, file_path=None):
+        """Get records and environment as json, e.g. to attach to a
+        support ticket.
+
+        Parameters
+        ----------
+        file_path : str, default=None
+            If set, the json is also written to this file.
+
+        Returns
+        -------
+        profile_json : str
+            Json with the records, the summary per stage and the
+            versions of Python, pandas and numpy.
+        """
+        import lucullus_rest
+        import numpy
+
+        profile_json = json.dumps({
+            "environment": {
+                "lucullus_rest": lucullus_rest.__version__,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "pandas": pd.__version__,
+                "numpy": numpy.__version__,
+            },
+            "summary": self.to_frame().reset_index().to_dict(orient="records"),
+            "records": self.records,
+        }, indent=2)
+        if file_path:
+            with open(file_path, "w", encoding="utf-8") as file:
+                file.write(profile_json)
+        return profile_json
+
+def profile_stage(profile, name, port=None):
+    """Get context manager that records a stage in profile, or does
+    nothing if profile is None.
+
+    Parameters
+    ----------
+    profile : Profile or None
+        Profile to record in.
+    name : str
+        Name of stage.
+    port : str, default=None
+        Port the stage belongs to.
+    """
+    if profile is None:
+        return contextlib.nullcontext()
+    return profile.stage(name, port=port)
@@ -0,0 +1,157 @@
+# MIT License
+# Copyright \(c\) 2023-2024 ZHAW (Institute of Embedded Systems at Zurich University of Applied Sciences) & Securecell AG
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# https://mit-license.org/
+
+"""Zero-copy handoff of DataFrames to worker processes over shared
+memory."""
+
+from multiprocessing import shared_memory
+
+from lucullus_rest.utils import LazyModule
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+class SharedFrame:
+    """DataFrame whose float64 columns are stored in a block of shared
+    memory, so worker processes can read them without pickling.
+
+    The float64 columns are copied once into the shared memory block.
+    The index and all other columns are small in comparison and are
+    pickled along with the descriptor.
+
+    Attributes
+    ----------
+    descriptor : dict
+        Picklable description of the frame, pass it to attach_frame
+        in the worker process.
+
+    Examples
+    --------
+    >>> shared = SharedFrame(collected_data)
+    >>> future = executor.submit(call_with_frame, fun, shared.descriptor)
+    >>> future.add_done_callback(lambda _: shared.unlink())
+    """
+
+    def __init__(self, data):
+        # Columns are selected by position, as ports of several
+        # devices share names
+        float_positions = [
+            position for position, dtype in enumerate(data.dtypes)
+            if dtype == np.float64
+        ]
+        other_positions = [
+            position for position in range(data.shape[1])
+            if position not in float_positions
+        ]
+        shape = (len(float_positions), len(data))
+        size = max(8 * shape[0] * shape[1], 1)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        values = np.ndarray(shape, dtype=np.float64, buffer=self._shm.buf)
+        for idx, position in enumerate(float_positions):
+            values[idx] = data.iloc[:, position].to_numpy()
+        del values
+
+        self.descriptor = {
+            "name": self._shm.name,
+            "shape": shape,
+            "float_positions": float_positions,
+            "other_positions": other_positions,
+            "columns": list(data.columns),
+            "index": data.index,
+            "other": data.iloc[:, other_positions],
+        }
+
+    def unlink(self):
+        """Release the shared memory block. Worker processes that are
+        still attached keep their view until they detach."""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+def attach_frame(descriptor):
+    """Rebuild the DataFrame of a SharedFrame in a worker process.
+
+    Parameters
+    ----------
+    descriptor : dict
+        SharedFrame.descriptor.
+
+    Returns
+    -------
+    shm : SharedMemory
+        Shared memory block, close it once data is not used anymore.
+    data : pandas DataFrame
+        DataFrame whose float64 columns are views of the shared
+        memory block.
+    """
+    # Worker processes share the resource tracker of the creating
+    # process, which unregisters the block again in SharedFrame.unlink.
+    shm = shared_memory.SharedMemory(name=descriptor["name"])
+    values = np.ndarray(descriptor["shape"], dtype=np.float64, buffer=shm.buf)
+    other = descriptor["other"]
+    if not len(other.columns):
+        data = pd.DataFrame(values.T, index=descriptor["index"], copy=False)
+    else:
+        # One block per column, so the float64 columns stay views of
+        # the shared memory block next to the other columns
+        columns = dict(zip(descriptor["float_positions"], values))
+        for idx, position in enumerate(descriptor["other_positions"]):
+            columns[position] = other.iloc[:, idx].array
+        data = pd.DataFrame(
+            {position: columns[position] for position in range(len(columns))},
+            index=descriptor["index"],
+            copy=False,
+        )
+    data.columns = descriptor["columns"]
+    return shm, data
+
+def call_with_frame(fun, descriptor, *args):
+    """Call fun with the DataFrame of a SharedFrame as first argument,
+    meant to run in a worker process.
+
+    Parameters
+    ----------
+    fun : function
+        Picklable function, e.g. defined at module level.
+    descriptor : dict
+        SharedFrame.descriptor.
+    *args
+        Further arguments passed to fun.
+
+    Returns
+    -------
+    result
+        Return value of fun.
+    """
+    shm, data = attach_frame(descriptor)
+    try:
+        return fun(data, *args)
+    finally:
+        del data
+        try:
+            shm.close()
+        except BufferError:
+            # fun kept a view of the shared memory, the mapping is
+            # released when the worker process exits.
+            pass
@@ -0,0 +1,234 @@
+# MIT License
+# Copyright \(c\) 2023-2024 ZHAW (Institute of Embedded Systems at Zurich University of Applied Sciences) & Securecell AG
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# https://mit-license.org/
+
+"""Stream current values of reactor ports to several consumers."""
+
+import asyncio
+import queue
+import threading
+import time
+import warnings
+from datetime import datetime
+import requests
+from lucullus_rest import core
+
+_CLOSED = object()
+
+class Subscription:
+    """Subscription to the current values of ports of a reactor.
+
+    A single background thread polls the current values over the
+    persistent session of the read client and passes every update to
+    all consumers.
+    Consumers iterate over the subscription, either with a for
+    loop or with an async for loop.
+
+    Attributes
+    ----------
+    reactor_name : str
+        Name of reactor.
+    ports : list
+        List of port names or port IDs.
+    auth : tuple
+        Tuple of username and password.
+    period : float, default=5
+        Time in seconds between two polls.
+    only_changes : bool, default=True
+        If True, updates are only passed on when the value of at
+        least one port has changed since the last update.
+    latest : dict or None
+        Latest update, with port names and time as "Time [h]".
+
+    Examples
+    --------
+    >>> subscription = subscribe("Reactor_1", ["PV_pO2", "PV_Temp"], auth, period=2)
+    >>> for update in subscription:
+    ...     print(update)
+    {'Time [h]': 1.52, 'PV_pO2': 99.9, 'PV_Temp': 30.1}
+    >>> subscription.close()
+    """
+
+    def __init__(self, reactor_name, ports, auth, period=5, only_changes=True):
+        """Initialize the Subscription class."""
+
+        self.reactor_name = reactor_name
+        self.ports = ports if isinstance(ports, list) else [ports]
+        self.auth = auth
+        self.period = period
+        self.only_changes = only_changes
+        self.latest = None
+
+        self._port_id_str = core.get_port_id_str(self.ports, auth)
+        self._client = core.get_client()
+        self._consumers = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """Request the current values once.
+
+        Returns
+        -------
+        current_values : dict
+            Dictionary with port names and time as "Time [h]".
+        """
+        json_data = self._client.get_json(
+            f"reactors/{self.reactor_name}?currentValues={self._port_id_str}", self.auth
+        )
+        return core.parse_current_values(json_data)
+
+    def close(self):
+        """Stop polling and end all iterations."""
+
+        with self._lock:
+            self._stop.set()
+            self._wake.set()
+            consumers = list(self._consumers)
+            thread = self._thread
+        for consumer in consumers:
+            consumer(_CLOSED)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def __iter__(self):
+        updates = queue.Queue()
+        self._add_consumer(updates.put)
+        try:
+            while True:
+                update = updates.get()
+                if update is _CLOSED:
+                    return
+                yield update
+        finally:
+            self._remove_consumer(updates.put)
+
+    async def __aiter__(self):
+        loop = asyncio.get_running_loop()
+        updates = asyncio.Queue()
+
+        def consumer(update):
+            loop.call_soon_threadsafe(updates.put_nowait, update)
+
+        self._add_consumer(consumer)
+        try:
+            while True:
+                update = await updates.get()
+                if update is _CLOSED:
+                    return
+                yield update
+        finally:
+            self._remove_consumer(consumer)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _add_consumer(self, consumer):
+        with self._lock:
+            if self._stop.is_set():
+                consumer(_CLOSED)
+                return
+            self._consumers.append(consumer)
+            if self.latest is not None:
+                consumer(self.latest)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._poll_cycle, daemon=True)
+                self._thread.start()
+
+    def _remove_consumer(self, consumer):
+        with self._lock:
+            if consumer in self._consumers:
+                self._consumers.remove(consumer)
+            if not self._consumers:
+                # Wake the poll thread up, so it stops polling
+                self._wake.set()
+
+    def _poll_cycle(self):
+        """Poll in the interval defined in period and pass changed
+        values on to all consumers, until there are no consumers left.
+        Polling starts again with the next consumer."""
+
+        while not self._stop.is_set():
+            with self._lock:
+                if not self._consumers:
+                    self._thread = None
+                    return
+            start_time = time.monotonic()
+            try:
+                current_values = self.poll()
+            except (requests.RequestException, KeyError, ValueError) as err:
+                warnings.warn(f"{datetime.now()}: Polling current values failed. {err}")
+            else:
+                self._publish(current_values)
+            self._wake.wait(max(0, self.period - (time.monotonic() - start_time)))
+            self._wake.clear()
+
+    def _publish(self, current_values):
+        with self._lock:
+            is_changed = (
+                self.latest is None
+                or not self.only_changes
+                or any(
+                    self.latest.get(key) != value
+                    for key, value in current_values.items()
+                    if key != "Time [h]"
+                )
+            )
+            if not is_changed:
+                return
+            self.latest = current_values
+            consumers = list(self._consumers)
+        for consumer in consumers:
+            consumer(current_values)
+
+def subscribe(reactor_name, ports, auth, period=5, only_changes=True):
+    """Subscribe to the current values of ports of a reactor.
+
+    Port IDs are resolved once, and one session and one poll are
+    shared by all consumers iterating over the subscription.
+
+    Parameters
+    ----------
+    reactor_name : str
+        Name of reactor.
+    ports : int, str or list of int or list of str
+        Port name or ID or list of names or IDs of several ports.
+    auth : tuple
+        Tuple of username and password.
+    period : float, default=5
+        Time in seconds between two polls.
+    only_changes : bool, default=True
+        If True, updates are only passed on when the value of at
+        least one port has changed.
+
+    Returns
+    -------
+    subscription : Subscription
+        Subscription that yields dictionaries with port names and
+        time as "Time [h]" when iterated over with for or async for.
+    """
+    return Subscription(reactor_name, ports, auth, period=period, only_changes=only_changes)
@@ -0,0 +1,510 @@
+# MIT License
+# Copyright \(c\) 2023-2024 ZHAW (Institute of Embedded Systems at Zurich University of Applied Sciences) & Securecell AG
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# https://mit-license.org/
+
+"""Local stand-in for a Lucullus server to run lucullus_rest offline.
+
+The FakeLucullusServer serves synthetic processes, ports, signals,
+reactors, recipes and attribute definitions over HTTP, with
+configurable latency and payload sizes, or responses recorded from a
+real server with record_fixtures.
+"""
+
+import gzip
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+from lucullus_rest import core
+
+API_PATH = "/lpims/rest/v1/"
+# Names of the states of processes, the first n_running processes are
+# running and the others finished
+_STATE_NAMES = {2: "Running", 3: "Finished", 4: "Paused"}
+
+class FakeLucullusServer:
+    """Local HTTP server that answers the REST endpoints used by
+    lucullus_rest with synthetic data.
+
+    Responses carry an ETag, and conditional requests for unchanged
+    responses are answered with 304 Not Modified.
+
+    Process i runs on reactor i, the first n_running processes are
+    running. Every process logs every port with one signal. Used as
+    context manager, the server is started and core.REST_URL points
+    to it until the context is left. Clients configured with
+    lucullus_rest.client.configure or environment variables take
+    precedence over core.REST_URL.
+
+    Attributes
+    ----------
+    n_processes : int, default=3
+        Number of processes.
+    n_ports : int, default=5
+        Number of process value ports 'PV_000', 'PV_001', ... in
+        addition to the ports 'IO_Switch', 'ST_LastUpdate' and
+        'ST_NextUpdate'.
+    n_points : int, default=1000
+        Number of datapoints per signal.
+    n_running : int, default=1
+        Number of running processes.
+    n_recipes : int, default=2
+        Number of recipes, every process is fed with all recipes.
+    n_steps : int, default=10
+        Number of steps per recipe.
+    page_size : int, default=None
+        If set, list endpoints return at most page_size items per
+        page with a 'next' link to the next page. Requested
+        'page[offset]' and 'page[limit]' query parameters are always
+        honored.
+    n_devices : int, default=1
+        Number of devices every port is logged for, more than one
+        results in duplicate port names.
+    sample_interval : float, default=60
+        Time in seconds between two datapoints.
+    latency : float, default=0
+        Time in seconds every request is delayed.
+    compression : bool, default=True
+        If True, responses are gzip compressed for requests that
+        accept it.
+    fixtures : dict or str, default=None
+        Recorded responses, or path to a json file with recorded
+        responses, with the requested path relative to the REST URL
+        (e.g. 'processes?name=Process_1') as keys. Recorded responses
+        take precedence over synthetic ones.
+    request_counts : collections.Counter
+        Number of requests per endpoint.
+    url : str
+        REST URL of the running server.
+
+    Examples
+    --------
+    >>> with FakeLucullusServer(n_ports=20, n_points=10000, latency=0.01) as server:
+    ...     df = export_to_df("Process_000", ["PV_000", "PV_001"], ("user", "password"))
+    >>> server.request_counts["signals"]
+    3
+    """
+
+    def __init__(self, n_processes=3, n_ports=5, n_points=1000, n_running=1, n_recipes=2,
+            n_steps=10, page_size=None, n_devices=1, sample_interval=60, latency=0,
+            compression=True, fixtures=None):
+        """Initialize the FakeLucullusServer class."""
+
+        self.n_processes = n_processes
+        self.n_ports = n_ports
+        self.n_points = n_points
+        self.n_running = n_running
+        self.n_recipes = n_recipes
+        self.n_steps = n_steps
+        self.page_size = page_size
+        self.n_devices = n_devices
+        self.sample_interval = sample_interval
+        self.latency = latency
+        self.compression = compression
+
+        if isinstance(fixtures, str):
+            with open(fixtures, encoding="utf-8") as file:
+                fixtures = json.load(file)
+        self.fixtures = fixtures if fixtures else {}
+
+        self.request_counts = Counter()
+        self.url = None
+        self._lock = threading.Lock()
+        self._current_values = {}
+        self._attributes = {}
+        self._httpd = None
+        self._thread = None
+        self._rest_url = None
+
+        self.ports = (
+            [{"id": 1, "name": "ST_LastUpdate", "dataType": "String"},
+             {"id": 2, "name": "ST_NextUpdate", "dataType": "String"},
+             {"id": 3, "name": "IO_Switch", "dataType": "Boolean"}]
+            + [{"id": 4 + i, "name": f"PV_{i:03d}", "dataType": "Float"} for i in range(n_ports)]
+        )
+        self.processes = [
+            {
+                "id": 100 + i,
+                "name": f"Process_{i:03d}",
+                "startTimestamp": "2024-01-01T00:00:00Z",
+                "state": 2 if i < n_running else 3,
+            }
+            for i in range(n_processes)
+        ]
+        self.reactors = [{"id": 200 + i, "name": f"Reactor_{i:03d}"} for i in range(n_processes)]
+        self.attribute_definitions = [
+            {"id": 300, "name": "Operator"},
+            {"id": 301, "name": "Setpoint"},
+        ]
+
+    def start(self):
+        """Start the server in a background thread and point
+        core.REST_URL to it.
+
+        Returns
+        -------
+        url : str
+            REST URL of the running server.
+        """
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}{API_PATH}"
+        self._rest_url = core.REST_URL
+        core.REST_URL = self.url
+        return self.url
+
+    def stop(self):
+        """Stop the server and restore core.REST_URL."""
+
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = None
+            core.REST_URL = self._rest_url
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def reset_counts(self):
+        """Reset the request counts."""
+
+        with self._lock:
+            self.request_counts.clear()
+
+    def handle(self, method, path, query, body=None):
+        """Answer a request.
+
+        Parameters
+        ----------
+        method : {"GET", "PUT"}
+            HTTP method.
+        path : str
+            Requested path relative to the REST URL.
+        query : dict
+            Query parameters with lists of values as returned by
+            urllib.parse.parse_qs.
+        body : dict, default=None
+            Json body of PUT requests.
+
+        Returns
+        -------
+        status_code : int
+            HTTP status code.
+        json_data : dict
+            Json response.
+        """
+        segments = path.strip("/").split("/")
+        with self._lock:
+            self.request_counts[segments[0]] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        params = {key: values[0] for key, values in query.items() if key != "UNATTENDED_REQUEST"}
+        try:
+            if method == "PUT":
+                return self._handle_put(segments, body)
+            return self._handle_get(segments, params)
+        except (KeyError, IndexError, ValueError):
+            return 404, {"error": f"Resource '{path}' not found."}
+
+    def _handle_get(self, segments, params):
+        resource = segments[0]
+        if resource == "processes" and len(segments) == 2:
+            return 200, self._process_detail(self._find(self.processes, segments[1]))
+        if resource == "processes":
+            processes = self.processes
+            if params.get("running") == "true":
+                processes = [p for p in processes if p["state"] == 2]
+            return 200, self._page(resource, params, _filter_name(processes, params))
+        if resource == "ports" and len(segments) == 2:
+            return 200, {"data": self._find(self.ports, segments[1])}
+        if resource == "ports":
+            return 200, self._page(resource, params, _filter_name(self.ports, params))
+        if resource == "attributedefinitions":
+            return 200, self._page(resource, params, self.attribute_definitions)
+        if resource == "reactors" and len(segments) == 2:
+            return 200, self._reactor_detail(
+                self._find(self.reactors, segments[1]), params.get("currentValues")
+            )
+        if resource == "reactors":
+            reactors = [
+                dict(reactor, process={"id": process["id"], "name": process["name"]})
+                for reactor, process in zip(self.reactors, self.processes)
+                if params.get("running") != "true" or process["state"] == 2
+            ]
+            return 200, self._page(resource, params, _filter_name(reactors, params))
+        if resource == "signals" and "portId" in params:
+            process = self._find(self.processes, params["processId"])
+            device = 0
+            if "deviceId" in params:
+                device = [
+                    self._signal(process, self.ports[0], d)["device"]["id"]
+                    for d in range(self.n_devices)
+                ].index(int(params["deviceId"]))
+            return 200, self._signal_values(
+                process,
+                self._find(self.ports, params["portId"]),
+                float(params.get("interval", 0)),
+                device
+            )
+        if resource == "signals":
+            process = self._find(self.processes, params["processId"])
+            return 200, {"data": [
+                self._signal(process, port, device)
+                for port in self.ports for device in range(self.n_devices)
+            ]}
+        if resource == "recipes":
+            return 200, self._recipe(segments[1])
+        return 404, {"error": f"Resource '{resource}' not found."}
+
+    def _handle_put(self, segments, body):
+        if segments[0] == "signals":
+            signal_id = int(segments[1])
+            with self._lock:
+                self._current_values[signal_id] = body["currentValue"]
+            return 200, {}
+        if segments[0] == "processes" and segments[2:] == ["attributes"]:
+            process = self._find(self.processes, segments[1])
+            with self._lock:
+                self._attributes.setdefault(process["id"], {}).update(body)
+            return 200, {}
+        return 404, {"error": "Resource not found."}
+
+    def _page(self, resource, params, items):
+        offset = int(params.get("page[offset]", 0))
+        limit = int(params.get("page[limit]", self.page_size or len(items) or 1))
+        response = {"data": items[offset:offset + limit]}
+        if offset + limit < len(items):
+            query = dict(params, **{"page[offset]": offset + limit, "page[limit]": limit})
+            response["links"] = {"next": f"{resource}?{urlencode(query, safe='[]')}"}
+        return response
+
+    @staticmethod
+    def _find(resources, key):
+        for resource in resources:
+            if str(resource["id"]) == str(key) or resource["name"] == key:
+                return resource
+        raise KeyError(key)
+
+    def _signal(self, process, port, device=0):
+        index = self.processes.index(process)
+        return {
+            "id": (process["id"] * 10000 + port["id"]) * 100 + device,
+            "port": port,
+            "reactor": self.reactors[index],
+            "device": {"id": 10000 + 100 * index + device, "name": f"Device_{index:03d}_{device}"},
+            "subDevice": {"id": 500 + index, "name": f"SubDevice_{index:03d}"},
+        }
+
+    def _value(self, port, point, device=0):
+        if port["dataType"] == "String":
+            return f"2024-01-01 00:{point % 60:02d}:00"
+        if port["dataType"] == "Boolean":
+            return float((point // 10) % 2)
+        return round(50 + 10 * math.sin(point / 50 + port["id"]) + device, 3)
+
+    def _signal_values(self, process, port, interval, device=0):
+        step = max(1, round(interval / self.sample_interval)) if interval else 1
+        values = [
+            [round(point * self.sample_interval / 3600, 6), self._value(port, point, device)]
+            for point in range(0, self.n_points, step)
+        ]
+        signal = self._signal(process, port, device)
+        signal.update({"values": values})
+        return {"data": signal}
+
+    def _process_detail(self, process):
+        attributes = self._attributes.get(process["id"], {})
+        return {
+            "data": dict(
+                process,
+                duration=self.n_points * self.sample_interval / 3600,
+                attributes=[
+                    {"definitionId": definition["id"],
+                     "value": str(attributes.get(definition["name"], ""))}
+                    for definition in self.attribute_definitions
+                ],
+                medium={"feeds": [
+                    {
+                        "recipe": {"id": 600 + i, "name": f"Recipe_{i:03d}"},
+                        "lot": {"id": 700 + i, "name": f"Lot_{i:03d}",
+                                "productionDate": "2024-01-01"},
+                        "planned": 1.0,
+                        "amount": 1.0 + i,
+                    }
+                    for i in range(self.n_recipes)
+                ]},
+            ),
+            "included": {
+                "processStateCodes": {"name": _STATE_NAMES.get(process["state"], "Unknown")},
+                "attributeDefinitions": self.attribute_definitions,
+            },
+        }
+
+    def _reactor_detail(self, reactor, port_ids):
+        process = self.processes[self.reactors.index(reactor)]
+        current_values = []
+        for port_id in port_ids.split(",") if port_ids else []:
+            port = self._find(self.ports, port_id)
+            signal_id = self._signal(process, port)["id"]
+            with self._lock:
+                value = self._current_values.get(signal_id, self._value(port, self.n_points - 1))
+            current_values.append({"id": port["id"], "name": port["name"], "value": value})
+        return {
+            "data": dict(
+                reactor,
+                process=dict(
+                    process,
+                    duration=self.n_points * self.sample_interval / 3600,
+                    currentValues=current_values,
+                ),
+            )
+        }
+
+    def _recipe(self, key):
+        recipe_id = int(key[len("Recipe_"):]) + 600 if key.startswith("Recipe_") else int(key)
+        if not 600 <= recipe_id < 600 + self.n_recipes:
+            raise KeyError(key)
+        n_steps = self.n_steps
+        return {
+            "data": {
+                "id": recipe_id,
+                "name": f"Recipe_{recipe_id - 600:03d}",
+                "steps": [
+                    # Every second step is stirring, without ingredient
+                    {
+                        "id": step,
+                        "actionId": 800 + step % 2,
+                        "ingredientId": 900 + step,
+                        "unitId": 1000 + step % 3,
+                        "amount": float(step),
+                    }
+                    if step % 2 == 0 else
+                    {"id": step, "actionId": 800 + step % 2, "unitId": 1002}
+                    for step in range(n_steps)
+                ],
+            },
+            "included": {
+                "actions": [{"id": 800, "name": "Add"}, {"id": 801, "name": "Stir"}],
+                "ingredients": [
+                    {"id": 900 + step, "name": f"Ingredient_{step:03d}"} for step in range(n_steps)
+                ],
+                "units": [
+                    {"id": 1000, "symbol": "g"},
+                    {"id": 1001, "symbol": "mL"},
+                    {"id": 1002, "symbol": "min"},
+                ],
+            },
+        }
+
+def _filter_name(resources, params):
+    if "name" in params:
+        return [resource for resource in resources if resource["name"] == params["name"]]
+    return resources
+
+def _make_handler(server):
+    """Create request handler class that passes requests on to the
+    FakeLucullusServer server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        """Request handler of FakeLucullusServer."""
+
+        def do_GET(self):
+            self._respond("GET")
+
+        def do_PUT(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length)) if length else None
+            self._respond("PUT", body)
+
+        def _respond(self, method, body=None):
+            url = urlsplit(self.path)
+            path = url.path[len(API_PATH):] if url.path.startswith(API_PATH) else url.path
+            fixture_key = path + ("?" + url.query if url.query else "")
+            if method == "GET" and fixture_key in server.fixtures:
+                with server._lock:
+                    server.request_counts[path.strip("/").split("/")[0]] += 1
+                status_code, json_data = 200, server.fixtures[fixture_key]
+            else:
+                status_code, json_data = server.handle(method, path, parse_qs(url.query), body)
+            payload = json.dumps(json_data).encode()
+            etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+            if method == "GET" and status_code == 200 and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json")
+            if server.compression and "gzip" in self.headers.get("Accept-Encoding", ""):
+                payload = gzip.compress(payload, compresslevel=1)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(payload)))
+            if method == "GET":
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def record_fixtures(paths, auth, file_path=None):
+    """Record responses of a Lucullus server for the FakeLucullusServer.
+
+    Parameters
+    ----------
+    paths : list of str
+        Requested paths relative to the REST URL, e.g.
+        'processes?name=Process_1'.
+    auth : tuple
+        Tuple of username and password.
+    file_path : str, default=None
+        Path of json file the fixtures are written to. If None, the
+        fixtures are only returned.
+
+    Returns
+    -------
+    fixtures : dict
+        Dictionary with the paths as keys and the json responses as
+        values.
+    """
+    fixtures = {}
+    for path in paths:
+        fixtures.update({path: core.get_client().get_json(path, auth)})
+
+    if file_path:
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(fixtures, file)
+    return fixtures
@@ -23,7 +23,34 @@
 
 """Utility functions to perform easy tasks."""
 
-import pandas as pd
+import importlib
+
+class LazyModule:
+    """Module that is only imported when one of its attributes is
+    accessed for the first time.
+
+    Used for numpy and pandas, so that scripts that only use the
+    lightweight REST functions do not pay their import time.
+
+    Attributes
+    ----------
+    name : str
+        Name of module to import.
+    """
+
+    def __init__(self, name):
+        """Initialize the LazyModule class."""
+
+        self.name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            self._module = importlib.import_module(self.name)
+        return getattr(self._module, attribute)
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
 
 def dictionaries_to_df(dictionaries):
     """Turn list of dictionaries into a pandas dataframe.
@@ -42,3 +69,74 @@ def dictionaries_to_df(dictionaries):
         [pd.DataFrame(dictionaries[idx], index=[idx]) for idx in range(len(dictionaries))]
     )
     return df_from_dict
+
+def resample_df(data, interval, method="mean"):
+    """Resample all columns of a dataframe onto a common time grid.
+
+    Parameters:
+    -----------
+    data: pandas dataframe
+        Dataframe with a timedelta index, e.g. from get_df_from_json.
+    interval: float
+        Interval of the time grid in seconds. The grid starts at the
+        process start.
+    method: {"mean", "last", "linear"} or dict, default="mean"
+        Resampling method. "mean" averages all values within an
+        interval, "last" takes the last value within an interval
+        and holds it until the next value, and "linear" linearly
+        interpolates the values at the grid points. A dictionary
+        with column names as keys and methods as values sets the
+        method per column, columns not in the dictionary use "mean".
+        Non-numeric columns are always resampled with "last".
+
+    Returns:
+    --------
+    resampled_df: pandas dataframe
+        Dataframe with the same columns and the time grid as index.
+        Each grid point labels the interval starting at it.
+    """
+    if interval <= 0:
+        raise ValueError("The interval for resampling has to be larger than 0.")
+    if data.empty:
+        return data.copy()
+
+    data = data.sort_index()
+    step = pd.Timedelta(seconds=interval).value
+    time_ns = data.index.values.astype("timedelta64[ns]").astype(np.int64)
+    grid = np.arange(0, time_ns.max() // step * step + 1, step)
+    bins = time_ns // step * step
+
+    methods = method if isinstance(method, dict) else {}
+    default_method = "mean" if isinstance(method, dict) else method
+    # Columns are selected by position, as ports of several devices share names
+    positional = data.set_axis(range(data.shape[1]), axis=1)
+    positions = {"mean": [], "last": [], "linear": []}
+    for position, column in enumerate(data.columns):
+        column_method = methods.get(column, default_method)
+        if column_method not in positions:
+            raise ValueError(f"Unknown resampling method '{column_method}'.")
+        if not pd.api.types.is_numeric_dtype(positional[position]):
+            column_method = "last"
+        positions[column_method].append(position)
+
+    resampled = []
+    if positions["mean"]:
+        resampled.append(positional[positions["mean"]].groupby(bins).mean().reindex(grid))
+    if positions["last"]:
+        resampled.append(
+            positional[positions["last"]].groupby(bins).last().reindex(grid).ffill()
+        )
+    if positions["linear"]:
+        linear = {}
+        for position in positions["linear"]:
+            values = positional[position].to_numpy(dtype=float, na_value=np.nan)
+            is_valid = ~np.isnan(values)
+            linear[position] = np.interp(
+                grid, time_ns[is_valid], values[is_valid], left=np.nan, right=np.nan
+            ) if is_valid.any() else np.full(len(grid), np.nan)
+        resampled.append(pd.DataFrame(linear, index=grid))
+
+    resampled_df = pd.concat(resampled, axis=1)[list(range(data.shape[1]))]
+    resampled_df.columns = data.columns
+    resampled_df.index = pd.TimedeltaIndex(grid.astype("timedelta64[ns]"), name=data.index.name)
+    return resampled_df
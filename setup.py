@@ -18,5 +18,9 @@ setup(
     install_requires=[
         "numpy", "pandas", "requests", "ipaddress"
     ],
+    extras_require={
+        "brotli": ["brotli"],
+        "test": ["pytest"],
+    },
     zip_safe=False
 )
@@ -0,0 +1,79 @@
+# MIT License
+# Copyright \(c\) 2023-2024 ZHAW (Institute of Embedded Systems at Zurich University of Applied Sciences) & Securecell AG
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# https://mit-license.org/
+
+"""Tests of the RingBuffer of the controller."""
+
+import numpy as np
+import pandas as pd
+from lucullus_rest.buffer import RingBuffer
+
+def make_df(hours, **columns):
+    index = pd.Index(pd.to_timedelta(hours, unit="h"), name="Time [h]")
+    return pd.DataFrame(columns, index=index)
+
+def test_append_bounds_rows():
+    buffer = RingBuffer(max_rows=3)
+    buffer.append(make_df([1, 2], PV=[1.0, 2.0]))
+    buffer.append(make_df([3, 4], PV=[3.0, 4.0]))
+    assert buffer.to_frame()["PV"].tolist() == [2.0, 3.0, 4.0]
+    assert buffer.watermark == pd.Timedelta(hours=4)
+
+def test_append_keeps_late_values():
+    buffer = RingBuffer(max_rows=10)
+    buffer.append(make_df([1, 2, 3], PV=[1.0, 2.0, 3.0], OD=[np.nan] * 3))
+    # An offline sample is entered after the fact at 1.5 h
+    buffer.append(make_df(
+        [1, 1.5, 2, 3, 4],
+        PV=[1.0, np.nan, 2.0, 3.0, 4.0],
+        OD=[np.nan, 0.5, np.nan, np.nan, np.nan]
+    ))
+    data = buffer.to_frame()
+    assert list(data.index) == list(pd.to_timedelta([1, 1.5, 2, 3, 4], unit="h"))
+    assert data["OD"].iloc[1] == 0.5
+    assert data["PV"].tolist()[2:] == [2.0, 3.0, 4.0]
+
+def test_append_merges_values_at_the_watermark():
+    buffer = RingBuffer(max_rows=10)
+    buffer.append(make_df([1, 2], PV=[1.0, 2.0], OD=[np.nan, np.nan]))
+    buffer.append(make_df([2, 3], PV=[np.nan, 3.0], OD=[0.5, np.nan]))
+    data = buffer.to_frame()
+    assert data["PV"].tolist() == [1.0, 2.0, 3.0]
+    assert data["OD"].iloc[1] == 0.5
+
+def test_append_repeated_column_names():
+    buffer = RingBuffer(max_rows=10)
+    data = pd.DataFrame(
+        [[1.0, 10.0], [2.0, 20.0]],
+        columns=["PV", "PV"],
+        index=pd.Index(pd.to_timedelta([1, 2], unit="h"), name="Time [h]")
+    )
+    buffer.append(data)
+    buffer.append(data)
+    assert list(buffer.to_frame().columns) == ["PV", "PV"]
+    assert buffer.to_frame().to_numpy().tolist() == [[1.0, 10.0], [2.0, 20.0]]
+
+def test_append_upgrades_dtype():
+    buffer = RingBuffer(max_age=3600 * 10)
+    buffer.append(make_df([1], Phase=[np.nan]))
+    buffer.append(make_df([2], Phase=["Batch"]))
+    assert buffer.to_frame()["Phase"].tolist()[-1] == "Batch"
@@ -0,0 +1,60 @@
+# MIT License
+# Copyright \(c\) 2023-2024 ZHAW (Institute of Embedded Systems at Zurich University of Applied Sciences) & Securecell AG
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# https://mit-license.org/
+
+"""Tests of the client helpers that do not need a server."""
+
+import gzip
+import zlib
+import pytest
+from lucullus_rest import client
+
+PAYLOAD = b'{"data": [' + b", ".join(b"%d" % i for i in range(1000)) + b"]}"
+
+def compress_raw_deflate(data):
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+@pytest.mark.parametrize("content_encoding, body", [
+    ("gzip", gzip.compress(PAYLOAD)),
+    ("deflate", zlib.compress(PAYLOAD)),
+    ("deflate", compress_raw_deflate(PAYLOAD)),
+])
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+def test_decompressor(content_encoding, body, chunk_size):
+    decompressor = client._get_decompressor(content_encoding)
+    chunks = [
+        decompressor.decompress(body[idx:idx + chunk_size])
+        for idx in range(0, len(body), chunk_size)
+    ]
+    assert b"".join(chunks) + decompressor.flush() == PAYLOAD
+
+def test_unsupported_content_encoding():
+    assert client._get_decompressor(None) is None
+    with pytest.raises(client.requests.HTTPError):
+        client._get_decompressor("compress")
+
+def test_auth_key():
+    assert client.auth_key(None) is None
+    assert client.auth_key(("user", "password")) == client.auth_key(("user", "password"))
+    assert client.auth_key(("user", "password")) != client.auth_key(("user", "wrong"))
+    assert "password" not in client.auth_key(("user", "password"))
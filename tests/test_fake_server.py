@@ -0,0 +1,262 @@
+# MIT License
+# Copyright \(c\) 2023-2024 ZHAW (Institute of Embedded Systems at Zurich University of Applied Sciences) & Securecell AG
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# https://mit-license.org/
+
+"""Regression tests of lucullus_rest against the FakeLucullusServer."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import pytest
+from lucullus_rest import client, core, utils
+from lucullus_rest.subscription import subscribe
+from lucullus_rest.testing import FakeLucullusServer
+
+AUTH = ("user", "password")
+
+@pytest.fixture
+def server():
+    with FakeLucullusServer(n_points=100) as fake_server:
+        yield fake_server
+    client.reset_configuration()
+
+def test_export_to_df(server):
+    df = core.export_to_df("Process_000", ["PV_000", "PV_001"], AUTH)
+    assert list(df.columns) == ["PV_000", "PV_001"]
+    assert len(df) == 100
+    assert df.index.name == "Time [h]"
+
+def test_export_to_df_compact_dtypes(server):
+    df = core.export_to_df("Process_000", ["PV_000", "IO_Switch"], AUTH, compact_dtypes=True)
+    assert str(df["PV_000"].dtype) == "float64"
+    assert str(df["IO_Switch"].dtype) == "boolean"
+
+def test_set_current_values(server):
+    with pytest.warns(UserWarning, match="Missing"):
+        written_ports = core.set_current_values(
+            "Process_000", {"PV_000": 1.5, "Missing": 2}, AUTH
+        )
+    assert written_ports == ["PV_000"]
+    values = core.get_current_values("Reactor_000", "PV_000", AUTH)
+    assert values["PV_000"] == 1.5
+
+def last_value(collected_data, calculated_data, attributes):
+    return {"PV_001": float(collected_data.loc[:, ["PV_000"]].iloc[-1, 0])}
+
+@pytest.mark.parametrize("n_devices", [1, 2])
+def test_controller_update(n_devices):
+    with FakeLucullusServer(n_points=100, n_devices=n_devices) as server:
+        controller = core.Controller(
+            "Process_000", ["PV_000"], AUTH, output_fun=last_value, print_progress=False,
+            historic_processes=["Process_001"], write_changes_only=True
+        )
+        controller.update()
+        assert len(controller.collected_data) == 200
+        assert controller.collected_data.shape[1] == n_devices
+        assert "PV_001" in controller._written_ports
+
+        server.reset_counts()
+        controller.update()
+        # Only the export and the heartbeat ports, PV_001 did not change
+        assert server.request_counts["signals"] == n_devices + 2
+    client.reset_configuration()
+
+@pytest.mark.parametrize("compact_dtypes", [False, True])
+def test_devices(compact_dtypes):
+    with FakeLucullusServer(n_points=100, n_devices=2):
+        df = core.export_to_df("Process_000", ["PV_000"], AUTH, compact_dtypes=compact_dtypes)
+        assert list(df.columns) == ["PV_000", "PV_000"]
+
+        df = core.export_to_df("Process_000", ["PV_000"], AUTH, devices=["Device_000_1"])
+        assert list(df.columns) == ["PV_000"]
+
+@pytest.mark.parametrize("method", ["mean", "last", "linear"])
+def test_devices_client_resampling(method):
+    with FakeLucullusServer(n_points=100, n_devices=2):
+        df = core.export_to_df(
+            "Process_000", ["PV_000", "PV_001"], AUTH, interval=600, resampling="client"
+        )
+        assert list(df.columns) == ["PV_000", "PV_000", "PV_001", "PV_001"]
+
+        data = core.export_to_df("Process_000", ["PV_000"], AUTH)
+        resampled = utils.resample_df(data, 600, method=method)
+        assert list(resampled.columns) == ["PV_000", "PV_000"]
+        assert not resampled.iloc[:, 0].equals(resampled.iloc[:, 1])
+    client.reset_configuration()
+
+def test_cache_revalidation(server):
+    cache = client.ResponseCache()
+    configured_client = client.configure(server.url, roles=("read", "export"), cache=cache)
+    first = core.get_process_signal_info("Process_000", AUTH)
+    core.get_signal_index("Process_000", AUTH, refresh=True)
+    second = core.get_process_signal_info("Process_000", AUTH)
+    assert first.equals(second)
+    assert cache.stats["revalidated"] >= 1
+    assert configured_client.stats["requests"] >= 2
+
+def test_pagination():
+    with FakeLucullusServer(n_processes=25, n_running=12, page_size=5) as server:
+        names = [item["name"] for item in core.iter_resources("processes", AUTH)]
+        assert len(names) == 25
+        assert server.request_counts["processes"] == 5
+        assert len(core.get_running_processes(AUTH)) == 12
+        assert len(core.get_name_to_id_dict("processes", AUTH)) == 25
+
+def test_controller_devices_with_buffer():
+    with FakeLucullusServer(n_points=100, n_devices=2):
+        controller = core.Controller(
+            "Process_000", ["PV_000"], AUTH, max_rows=20, print_progress=False
+        )
+        controller.collect_data()
+        controller.collect_data()
+        assert list(controller.collected_data.columns) == ["PV_000", "PV_000"]
+        assert len(controller.collected_data) == 20
+    client.reset_configuration()
+
+def sum_devices(collected_data, calculated_data, attributes):
+    return collected_data.sum(axis=1).to_frame("Sum")
+
+def test_controller_devices_calc_pool():
+    with FakeLucullusServer(n_points=100, n_devices=2):
+        controller = core.Controller(
+            "Process_000", ["PV_000", "IO_Switch"], AUTH, calc_fun=sum_devices, calc_pool=1,
+            print_progress=False
+        )
+        try:
+            controller.collect_data()
+            controller.update_calculations()
+        finally:
+            controller.close()
+        assert controller.calculated_data["Sum"].equals(
+            controller.collected_data.sum(axis=1).rename("Sum")
+        )
+    client.reset_configuration()
+
+def test_name_registry_refresh(server):
+    assert core.get_name_to_id_dict("processes", AUTH)["Process_000"] == 100
+    server.processes[0]["name"] = "Renamed"
+    server.processes.pop()
+    server.processes.append({**server.processes[1], "id": 150, "name": "New_Process"})
+    names = core.get_name_to_id_dict("processes", AUTH)
+    assert names["Renamed"] == 100
+    assert names["New_Process"] == 150
+    assert "Process_000" not in names
+    assert "Process_002" not in names
+    assert core.get_registry("processes", AUTH).get_name(100) == "Renamed"
+
+def test_controller_reports_adapted_interval(server):
+    controller = core.Controller(
+        "Process_000", ["PV_000"], AUTH, print_progress=False, update_interval=60,
+        min_interval=10, max_interval=600, change_threshold=100
+    )
+    for _ in range(3):
+        controller.update()
+        values = core.get_current_values(
+            "Reactor_000", ["ST_LastUpdate", "ST_NextUpdate"], AUTH
+        )
+        next_update = pd.Timestamp(values["ST_NextUpdate"]) - pd.Timestamp(values["ST_LastUpdate"])
+        assert next_update.total_seconds() == controller.current_interval
+    assert controller.current_interval == 135
+
+def test_new_device_of_known_port(server):
+    core.export_to_df("Process_000", ["PV_000"], AUTH)
+    # A second device starts logging the ports after the index was built
+    server.n_devices = 2
+    df = core.export_to_df("Process_000", ["PV_000"], AUTH, devices=["Device_000_1"])
+    assert list(df.columns) == ["PV_000"]
+    written_ports = core.set_current_values(
+        "Process_000", {"PV_001": 1.5}, AUTH, devices={"PV_001": "Device_000_1"}
+    )
+    assert written_ports == ["PV_001"]
+
+def test_signal_ttl_of_finished_processes(server):
+    client.configure(server.url, roles=("read", "export"), cache=client.ResponseCache())
+    server.processes[1]["state"] = 4
+    for process in ["Process_001", "Process_002"]:
+        core.export_to_df(process, ["PV_000"], AUTH)
+        server.reset_counts()
+        core.export_to_df(process, ["PV_000"], AUTH)
+        # Signals of the paused process are revalidated, the ones of
+        # the finished process are taken from the cache
+        assert server.request_counts["signals"] == (1 if process == "Process_001" else 0)
+
+def test_single_flight(server):
+    server.latency = 0.2
+    shared_client = client.Client(server.url)
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(
+            lambda _: shared_client.get_json("processes", AUTH), range(4)
+        ))
+    assert all(result == results[0] for result in results)
+    assert server.request_counts["processes"] == 1
+    assert shared_client.stats["shared"] == 3
+
+@pytest.mark.parametrize("compression", [False, True])
+def test_compression(server, compression):
+    export_client = client.Client(server.url, compression=compression)
+    json_data = export_client.get_json("signals?processId=100&portId=4&interval=0", AUTH)
+    assert len(json_data["data"]) > 0
+    if compression:
+        assert export_client.stats["bytes_received"] < export_client.stats["bytes_decoded"]
+    else:
+        assert export_client.stats["bytes_received"] == export_client.stats["bytes_decoded"]
+
+def test_subscription(server):
+    subscription = subscribe("Reactor_000", ["PV_000"], AUTH, period=0.05, only_changes=False)
+    with subscription:
+        updates = []
+        for update in subscription:
+            updates.append(update)
+            if len(updates) == 3:
+                break
+        assert set(updates[0]) == {"Time [h]", "PV_000"}
+        # Polling stops once the last consumer left
+        thread = subscription._thread
+        if thread is not None:
+            thread.join(timeout=1)
+        server.reset_counts()
+        time.sleep(0.2)
+        assert server.request_counts["reactors"] == 0
+
+        for update in subscription:
+            break
+        assert update["PV_000"] == subscription.latest["PV_000"]
+
+def test_checkpoint_warm_restart(server, tmp_path):
+    checkpoint_path = str(tmp_path / "controller.pkl")
+    settings = {
+        "historic_processes": ["Process_001"], "print_progress": False,
+        "checkpoint_path": checkpoint_path,
+    }
+    controller = core.Controller("Process_000", ["PV_000"], AUTH, **settings)
+    controller.update()
+    controller.close()
+
+    server.reset_counts()
+    restarted = core.Controller("Process_000", ["PV_000"], AUTH, **settings)
+    assert server.request_counts["signals"] == 0
+    assert restarted.collected_data.equals(controller.collected_data)
+    restarted.close()
+
+    with pytest.warns(UserWarning, match="another controller configuration"):
+        other = core.Controller("Process_000", ["PV_001"], AUTH, **settings)
+    other.close()
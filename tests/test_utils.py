@@ -0,0 +1,65 @@
+# MIT License
+# Copyright \(c\) 2023-2024 ZHAW (Institute of Embedded Systems at Zurich University of Applied Sciences) & Securecell AG
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# https://mit-license.org/
+
+"""Tests of the utility functions."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from lucullus_rest.utils import resample_df
+
+@pytest.fixture
+def data():
+    index = pd.Index(pd.to_timedelta([0, 30, 60, 90, 150], unit="s"), name="Time [h]")
+    return pd.DataFrame(
+        {
+            "PV": [1.0, 3.0, 5.0, np.nan, 9.0],
+            "Phase": ["A", None, "B", None, None],
+        },
+        index=index,
+    )
+
+def test_resample_mean(data):
+    resampled = resample_df(data, 60)
+    assert list(resampled.index) == list(pd.to_timedelta([0, 60, 120], unit="s"))
+    assert resampled["PV"].tolist() == [2.0, 5.0, 9.0]
+    # Non-numeric columns are always resampled with the last value
+    assert resampled["Phase"].tolist() == ["A", "B", "B"]
+
+def test_resample_last_and_linear(data):
+    resampled = resample_df(data, 60, method={"PV": "last"})
+    assert resampled["PV"].tolist() == [3.0, 5.0, 9.0]
+    resampled = resample_df(data, 60, method="linear")
+    assert resampled["PV"].tolist() == pytest.approx([1.0, 5.0, 5.0 + 4.0 * 60 / 90])
+
+def test_resample_repeated_column_names(data):
+    data.columns = ["PV", "PV"]
+    resampled = resample_df(data, 60)
+    assert list(resampled.columns) == ["PV", "PV"]
+    assert resampled.iloc[:, 1].tolist() == ["A", "B", "B"]
+
+def test_resample_invalid_arguments(data):
+    with pytest.raises(ValueError):
+        resample_df(data, 0)
+    with pytest.raises(ValueError):
+        resample_df(data, 60, method="median")